@@ -3,12 +3,30 @@
 BrowserStack Test Results Analysis
 ==================================
 This script analyzes the test results and provides actionable insights.
+
+With --history it streams over every recorded run instead (the run history
+database or a glob of result JSON files) in constant memory and reports
+per-browser duration percentiles, failure and retry rates, flakiness within a
+run and duration regressions between time windows.
+
+Usage:
+    python analyze_results.py
+    python analyze_results.py --history results_history.sqlite --window-days 7
+    python analyze_results.py --history "browserstack_test_results*.json" --json stats.json
 """
 
+import argparse
+import glob
 import json
 import os
+import sys
+from contextlib import redirect_stdout
 from datetime import datetime
 
+from quantile_sketch import QuantileSketch
+from run_history import RunHistory
+from scheduler import parse_seconds
+
 def analyze_results(results_file="browserstack_test_results.json"):
     """Analyze BrowserStack test results and provide insights"""
     
@@ -67,8 +85,8 @@ def analyze_results(results_file="browserstack_test_results.json"):
         else:
             desktop_browsers.append(result)
     
-    print(f"Desktop Browsers: {len(desktop_browsers)}")
-    print(f"Mobile Browsers: {len(mobile_browsers)}")
+    print(f"Desktop Browsers: {len({r.get('browser') for r in desktop_browsers})} ({len(desktop_browsers)} URL checks)")
+    print(f"Mobile Browsers: {len({r.get('browser') for r in mobile_browsers})} ({len(mobile_browsers)} URL checks)")
     print()
     
     # Detailed Results
@@ -83,6 +101,7 @@ def analyze_results(results_file="browserstack_test_results.json"):
             session_id = result.get('session_id', 'N/A')
             
             print(f"✅ {browser}")
+            print(f"   URL: {result.get('url', summary.get('target_url', 'N/A'))}")
             print(f"   Status: PASSED")
             print(f"   Articles Found: {articles}")
             print(f"   Spanish Content: {'Yes' if spanish_content else 'No'}")
@@ -94,6 +113,7 @@ def analyze_results(results_file="browserstack_test_results.json"):
             session_id = result.get('session_id', 'N/A')
             
             print(f"❌ {browser}")
+            print(f"   URL: {result.get('url', summary.get('target_url', 'N/A'))}")
             print(f"   Status: FAILED")
             print(f"   Error: {error}")
             print(f"   Execution Time: {exec_time}")
@@ -151,9 +171,212 @@ def analyze_results(results_file="browserstack_test_results.json"):
     
     return success_rate >= 80
 
+
+def iter_history(source, browser=None, since=None):
+    """Yield result records in time order, each with its run_id, from a history database or result JSON files"""
+    if source.endswith((".sqlite", ".db")):
+        if not os.path.exists(source):
+            return
+        history = RunHistory(source)
+        try:
+            yield from history.iter_results(browser, since)
+        finally:
+            history.close()
+        return
+
+    # Result JSON files written by browserstack_test.py, one run per file, so the path identifies the run
+    for path in sorted(glob.glob(source), key=os.path.getmtime):
+        recorded_at = os.path.getmtime(path)
+        if since and recorded_at < since:
+            continue
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            continue
+        build_name = data.get("summary", {}).get("build_name")
+        for result in data.get("results", []):
+            if browser and result.get("browser") != browser:
+                continue
+            yield dict(result, recorded_at=recorded_at, build_name=build_name, run_id=path)
+
+
+class BrowserStats:
+    """Running statistics of one browser configuration"""
+
+    def __init__(self):
+        self.sketch = QuantileSketch()
+        self.checks = 0
+        self.failures = 0
+        self.retried = 0
+        self.retries = 0
+        self.flips = 0
+        self.run = None
+        self.last_status = {}
+        self.window = None
+        self.current = QuantileSketch()
+        self.previous = None
+
+    def add(self, record, window_seconds):
+        self.checks += 1
+        status = record.get("status")
+        if status != "PASSED":
+            self.failures += 1
+        retries = record.get("retries") or 0
+        self.retries += retries
+        self.retried += 1 if retries else 0
+
+        # A flip is an outcome change within one run: a check that only passed after
+        # retrying, or a URL checked again with another result. Records of a run
+        # arrive together, so only the current run's statuses are kept.
+        run = record.get("run_id")
+        if run != self.run:
+            self.run, self.last_status = run, {}
+        url = record.get("url")
+        previous_status = self.last_status.get(url)
+        self.flips += (status == "PASSED" and retries > 0) or (previous_status not in (None, status))
+        self.last_status[url] = status
+
+        duration = parse_seconds(record.get("duration", record.get("execution_time")))
+        if duration is None:
+            return
+        self.sketch.add(duration)
+
+        # Records arrive in time order, so only the two latest windows are kept
+        window = int((record.get("recorded_at") or 0) // window_seconds)
+        if self.window is not None and window != self.window:
+            self.previous = self.current
+            self.current = QuantileSketch()
+        self.window = window
+        self.current.add(duration)
+
+    def summary(self, threshold):
+        quantiles = {f"p{int(q * 100)}": self.sketch.quantile(q) for q in (0.5, 0.9, 0.99)}
+        regression = None
+        if self.previous and self.previous.count and self.current.count:
+            before, after = self.previous.quantile(0.5), self.current.quantile(0.5)
+            if before and after > before * (1 + threshold):
+                regression = {"previous_p50": before, "current_p50": after, "change": after / before - 1}
+        return {
+            "checks": self.checks,
+            "durations": self.sketch.count,
+            "mean": self.sketch.mean,
+            **quantiles,
+            "failure_rate": self.failures / self.checks if self.checks else 0.0,
+            "retry_rate": self.retried / self.checks if self.checks else 0.0,
+            "retries": self.retries,
+            "flakiness": self.flips / self.checks if self.checks else 0.0,
+            "flips": self.flips,
+            "regression": regression,
+            "sketch": self.sketch.to_dict()
+        }
+
+
+def analyze_history(source, browser=None, since_days=None, window_days=7.0, threshold=0.2, json_file=None):
+    """Stream every historical result record and report per-browser statistics
+
+    With json_file "-", stdout carries only the JSON report and the text report
+    goes to stderr.
+    """
+    stdout = sys.stdout
+    with redirect_stdout(sys.stderr if json_file == "-" else stdout):
+        report = _history_report(source, browser, since_days, window_days, threshold, json_file)
+    if report is None:
+        return False
+    if json_file == "-":
+        json.dump(report, stdout, indent=2)
+        stdout.write("\n")
+    return not any(row["regression"] for row in report["browsers"].values())
+
+
+def _history_report(source, browser, since_days, window_days, threshold, json_file):
+    """Print the history report and return it as a dict, or None without records"""
+    since = datetime.now().timestamp() - since_days * 86400 if since_days else None
+    window_seconds = window_days * 86400
+
+    stats = {}
+    records = 0
+    for record in iter_history(source, browser, since):
+        records += 1
+        name = record.get("browser", "Unknown")
+        if name not in stats:
+            stats[name] = BrowserStats()
+        stats[name].add(record, window_seconds)
+
+    if not records:
+        print(f"❌ No historical results found in: {source}")
+        print("   Run the tests first to generate results.")
+        return None
+
+    report = {
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        "source": source,
+        "records": records,
+        "window_days": window_days,
+        "regression_threshold": threshold,
+        "browsers": {name: browser_stats.summary(threshold) for name, browser_stats in sorted(stats.items())}
+    }
+
+    print("=" * 80)
+    print("BROWSERSTACK RESULT HISTORY ANALYSIS")
+    print("=" * 80)
+    print(f"Source: {source} ({records} URL checks)")
+    print()
+    print("⏱️ DURATION PERCENTILES AND RELIABILITY")
+    print("-" * 80)
+    print(f"{'Browser':<24}{'Checks':>7}{'p50 s':>8}{'p90 s':>8}{'p99 s':>8}{'Fail %':>8}{'Retry %':>9}{'Flaky %':>9}")
+
+    def seconds(value):
+        return f"{value:.2f}" if value is not None else "-"
+
+    for name, row in report["browsers"].items():
+        print(f"{name:<24}{row['checks']:>7}{seconds(row['p50']):>8}{seconds(row['p90']):>8}{seconds(row['p99']):>8}"
+              f"{row['failure_rate'] * 100:>8.1f}{row['retry_rate'] * 100:>9.1f}{row['flakiness'] * 100:>9.1f}")
+
+    regressions = {name: row["regression"] for name, row in report["browsers"].items() if row["regression"]}
+    print()
+    print(f"📈 WINDOW-OVER-WINDOW REGRESSIONS ({window_days:g}-day windows, >{threshold * 100:.0f}% p50)")
+    print("-" * 80)
+    if regressions:
+        for name, regression in regressions.items():
+            print(f"   ⚠️ {name}: p50 {regression['previous_p50']:.2f}s -> {regression['current_p50']:.2f}s "
+                  f"(+{regression['change'] * 100:.0f}%)")
+    else:
+        print("   ✅ No browser regressed against its previous window")
+
+    flaky = [name for name, row in report["browsers"].items() if row["flips"]]
+    if flaky:
+        print(f"\n🔁 Flaky configurations: {', '.join(flaky)}")
+
+    if json_file and json_file != "-":
+        with open(json_file, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nMachine-readable report saved to: {json_file}")
+
+    print("\n" + "=" * 80)
+    return report
+
+
 if __name__ == "__main__":
-    success = analyze_results()
+    parser = argparse.ArgumentParser(description="Analyze BrowserStack test results")
+    parser.add_argument("results_file", nargs="?", default="browserstack_test_results.json")
+    parser.add_argument("--history", metavar="SOURCE",
+                        help="history database (.sqlite) or glob of result JSON files")
+    parser.add_argument("--browser", help="only analyze this browser configuration")
+    parser.add_argument("--since-days", type=float, help="only records from the last N days")
+    parser.add_argument("--window-days", type=float, default=7.0, help="regression window length")
+    parser.add_argument("--threshold", type=float, default=0.2, help="p50 slowdown flagged as a regression")
+    parser.add_argument("--json", dest="json_file", help="write the history report as JSON ('-' for stdout)")
+    args = parser.parse_args()
+
+    if args.history:
+        success = analyze_history(args.history, args.browser, args.since_days, args.window_days,
+                                  args.threshold, args.json_file)
+    else:
+        success = analyze_results(args.results_file)
+    # Keep stdout a valid JSON document with --json -
+    status = sys.stderr if args.history and args.json_file == "-" else sys.stdout
     if success:
-        print("🎉 Analysis complete - Tests are performing well!")
+        print("🎉 Analysis complete - Tests are performing well!", file=status)
     else:
-        print("⚠️ Analysis complete - Review recommendations above.")
+        print("⚠️ Analysis complete - Review recommendations above.", file=status)
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Article Store
+=============
+One SQLite database holds every scraped article, keyed by canonical URL, with
+its Spanish and English titles and content, cover image reference, listing
+position and fetch timestamps. Near-duplicates of another article only keep
+their title and a link to it. Writes are batched into single transactions.
+The exporter writes the per-article folder layout on demand.
+
+Usage:
+    python article_store.py export
+    python article_store.py export exported_articles
+"""
+
+import argparse
+import os
+import sqlite3
+import threading
+import time
+from urllib.parse import urlsplit, urlunsplit
+
+from image_store import ImageStore
+from scraper_config import SCRAPER_CONFIG
+
+COLUMNS = [
+    "url", "position", "title_es", "title_en", "content_es", "image_url", "image_blob",
+    "listed_at", "fetched_at", "created_at", "updated_at", "duplicate_of", "content_en"
+]
+# Columns added after the first release, created on older databases at startup
+ADDED_COLUMNS = {"duplicate_of": "TEXT", "content_en": "TEXT"}
+
+
+def canonical_url(url, keep_query=False):
+    """Store key of an article URL: lower-case host, no fragment and (by default) no query string"""
+    parts = urlsplit(url.strip())
+    query = parts.query if keep_query else ""
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path or "/", query, ""))
+
+
+class ArticleStore:
+    """SQLite store of articles keyed by canonical URL"""
+
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS articles ("
+            " url TEXT PRIMARY KEY, position INTEGER, title_es TEXT NOT NULL, title_en TEXT,"
+            " content_es TEXT, image_url TEXT, image_blob TEXT, listed_at REAL, fetched_at REAL,"
+            " created_at REAL NOT NULL, updated_at REAL NOT NULL, duplicate_of TEXT, content_en TEXT)"
+        )
+        existing = {row[1] for row in self._conn.execute("PRAGMA table_info(articles)")}
+        for column, column_type in ADDED_COLUMNS.items():
+            if column not in existing:
+                self._conn.execute(f"ALTER TABLE articles ADD COLUMN {column} {column_type}")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS articles_listed ON articles (listed_at, position)")
+        self._conn.commit()
+
+    def get(self, url):
+        """Return the stored article as a dict, or None"""
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {', '.join(COLUMNS)} FROM articles WHERE url = ?", (canonical_url(url),)
+            ).fetchone()
+        return dict(zip(COLUMNS, row)) if row else None
+
+    def put_many(self, records, listed_at=None):
+        """Insert or update articles in one transaction; None fields keep their stored value
+
+        Each record needs url and title_es; position, content_es, image_url,
+        image_blob, fetched_at and duplicate_of are optional. Storing content
+        clears an earlier duplicate_of link.
+        """
+        now = time.time()
+        rows = [(
+            canonical_url(record["url"]), record.get("position"), record["title_es"],
+            record.get("content_es"), record.get("image_url"), record.get("image_blob"),
+            listed_at, record.get("fetched_at"), now, now, record.get("duplicate_of")
+        ) for record in records]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO articles (url, position, title_es, content_es, image_url, image_blob,"
+                " listed_at, fetched_at, created_at, updated_at, duplicate_of)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+                " ON CONFLICT(url) DO UPDATE SET"
+                " position = COALESCE(excluded.position, position),"
+                " title_en = CASE WHEN excluded.title_es = title_es THEN title_en END,"
+                " title_es = excluded.title_es,"
+                " content_en = CASE WHEN excluded.content_es IS NULL OR excluded.content_es = content_es"
+                "  THEN content_en END,"
+                " content_es = COALESCE(excluded.content_es, content_es),"
+                " image_url = COALESCE(excluded.image_url, image_url),"
+                " image_blob = COALESCE(excluded.image_blob, image_blob),"
+                " listed_at = COALESCE(excluded.listed_at, listed_at),"
+                " fetched_at = COALESCE(excluded.fetched_at, fetched_at),"
+                " duplicate_of = CASE WHEN excluded.content_es IS NOT NULL THEN NULL"
+                "  ELSE COALESCE(excluded.duplicate_of, duplicate_of) END,"
+                " updated_at = excluded.updated_at",
+                rows
+            )
+
+    def put_translations(self, pairs):
+        """Store (url, English title) pairs in one transaction"""
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "UPDATE articles SET title_en = ?, updated_at = ? WHERE url = ?",
+                [(title_en, now, canonical_url(url)) for url, title_en in pairs]
+            )
+
+    def put_content_translations(self, pairs):
+        """Store (url, English content) pairs in one transaction"""
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "UPDATE articles SET content_en = ?, updated_at = ? WHERE url = ?",
+                [(content_en, now, canonical_url(url)) for url, content_en in pairs]
+            )
+
+    def iter_articles(self, batch_size=500):
+        """Every stored article, in batches so large stores are not loaded at once"""
+        last_url = ""
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    f"SELECT {', '.join(COLUMNS)} FROM articles WHERE url > ? ORDER BY url LIMIT ?",
+                    (last_url, batch_size)
+                ).fetchall()
+            if not rows:
+                return
+            for row in rows:
+                yield dict(zip(COLUMNS, row))
+            last_url = rows[-1][0]
+
+    def latest_listing(self):
+        """Articles of the most recent listing, in listing order"""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {', '.join(COLUMNS)} FROM articles"
+                " WHERE listed_at = (SELECT MAX(listed_at) FROM articles) ORDER BY position"
+            ).fetchall()
+        return [dict(zip(COLUMNS, row)) for row in rows]
+
+    def export(self, output_dir, articles=None):
+        """Write the article_<n>/ folders and title lists for articles (default: latest listing)"""
+        articles = self.latest_listing() if articles is None else articles
+        # Near-duplicates are links to another article, not articles of their own
+        articles = [article for article in articles if not article.get("duplicate_of")]
+        os.makedirs(output_dir, exist_ok=True)
+        linker = ImageStore(SCRAPER_CONFIG["image_store_dir"])
+
+        for article in articles:
+            article_dir = os.path.join(output_dir, f"article_{article['position']}")
+            os.makedirs(article_dir, exist_ok=True)
+            _write_text(os.path.join(article_dir, "title_es.txt"), article["title_es"])
+            if article["title_en"] is not None:
+                _write_text(os.path.join(article_dir, "title_en.txt"), article["title_en"])
+            if article["content_es"] is not None:
+                _write_text(os.path.join(article_dir, "content_es.txt"), article["content_es"])
+            if article.get("content_en") is not None:
+                _write_text(os.path.join(article_dir, "content_en.txt"), article["content_en"])
+            if article["image_blob"] and os.path.exists(article["image_blob"]):
+                ext = os.path.splitext(article["image_blob"])[1]
+                linker.link(article["image_blob"], os.path.join(article_dir, f"cover{ext}"))
+
+        _write_text(os.path.join(output_dir, "original_titles.txt"),
+                    "".join(article["title_es"] + "\n" for article in articles))
+        _write_text(os.path.join(output_dir, "translated_titles.txt"),
+                    "".join(article["title_en"] + "\n" for article in articles if article["title_en"] is not None))
+        return len(articles)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def _write_text(path, text):
+    """Write a text file via temp file plus rename"""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export stored articles to the folder layout")
+    parser.add_argument("command", choices=["export"])
+    parser.add_argument("output_dir", nargs="?", default=SCRAPER_CONFIG["output_dir"])
+    parser.add_argument("--store", default=SCRAPER_CONFIG["article_store"])
+    args = parser.parse_args()
+
+    store = ArticleStore(args.store)
+    count = store.export(args.output_dir)
+    store.close()
+    print(f"✅ Exported {count} articles to {args.output_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Pipeline Stage Benchmark
+========================
+Runs each stage of the main.py workflow, plus the local_test.py page checks,
+against fixtures recorded with fixture_server.py and a stub translator.
+Reports throughput and latency percentiles per stage and compares the p50 of
+every stage with a stored baseline; a regression past the threshold fails.
+
+Usage:
+    python benchmark.py fixtures/elpais --update-baseline
+    python benchmark.py fixtures/elpais --iterations 20 --threshold 0.25
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from extractors import (
+    LISTING_SCOPE, ARTICLE_SCOPE, parse_listing, extract_content, find_cover_image
+)
+from fixture_server import FixtureServer, FixtureStore
+from image_store import ImageStore
+from local_test import validate_page
+from page_parser import parse_html
+from scraper_config import SCRAPER_CONFIG
+from test_config import TEST_CONFIG
+from translation import BatchTranslator, BodyTranslator, StubTranslator, TranslationCache
+from word_stats import count_words, repeated_words
+
+DEFAULT_BASELINE = "benchmark_baseline.json"
+
+
+def percentile(ordered, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def time_ops(ops, iterations):
+    """Run every op `iterations` times and return the per-op latencies"""
+    latencies = []
+    for _ in range(iterations):
+        for op in ops:
+            start = time.perf_counter()
+            op()
+            latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def summarize(latencies):
+    ordered = sorted(latencies)
+    return {
+        "ops": len(ordered),
+        "throughput": len(ordered) / sum(ordered) if sum(ordered) else 0.0,
+        "p50_ms": percentile(ordered, 0.50) * 1000,
+        "p90_ms": percentile(ordered, 0.90) * 1000,
+        "p99_ms": percentile(ordered, 0.99) * 1000
+    }
+
+
+def load_fixtures(fixtures_dir):
+    """Split recorded responses into the listing page, article pages and images"""
+    store = FixtureStore(fixtures_dir)
+    listing_url = SCRAPER_CONFIG["listing_url"].replace(SCRAPER_CONFIG["base_url"], "https://elpais.com")
+    listings, articles, images = [], [], []
+    for url, entry in sorted(store.index.items()):
+        content_type = entry["headers"].get("Content-Type", "")
+        if entry["status"] != 200:
+            continue
+        if "text/html" in content_type:
+            _, body = store.get(url)
+            (listings if url == listing_url else articles).append(body)
+        elif content_type.startswith("image/"):
+            images.append(url)
+    return store, listings, articles, images
+
+
+def build_stages(store, listings, articles, images, workdir):
+    """Return {stage name: list of zero-argument ops}"""
+    base_url = SCRAPER_CONFIG["base_url"]
+    stages = {}
+
+    stages["listing_parse"] = [
+        lambda html=html: parse_listing(parse_html(html, SCRAPER_CONFIG["parser_backend"], LISTING_SCOPE),
+                                        base_url, SCRAPER_CONFIG["max_articles"])
+        for html in listings
+    ]
+
+    def extract_article(html):
+        page = parse_html(html, SCRAPER_CONFIG["parser_backend"], ARTICLE_SCOPE)
+        return extract_content(page), find_cover_image(page, base_url)
+
+    stages["article_extraction"] = [lambda html=html: extract_article(html) for html in articles]
+
+    # Titles to translate and analyze come from the recorded listing
+    titles = []
+    for html in listings:
+        titles.extend(entry["title"] for entry in parse_listing(parse_html(html), base_url, 1000))
+
+    counter = iter(range(10 ** 9))
+
+    def translate_cold():
+        cache = TranslationCache(os.path.join(workdir, f"translations_{next(counter)}.sqlite"))
+        BatchTranslator(cache=cache, translator=StubTranslator()).translate_many(titles)
+        cache.close()
+
+    warm_cache = TranslationCache(os.path.join(workdir, "translations_warm.sqlite"))
+    warm_translator = BatchTranslator(cache=warm_cache, translator=StubTranslator())
+    warm_translator.translate_many(titles)
+    translated = [warm_translator.translate_many(titles)[title] for title in titles]
+
+    # Chunked body translation, uncached, against the stub
+    bodies = [extract_article(html)[0] for html in articles]
+    bodies = [body for body in bodies if body]
+    if bodies:
+        body_translator = BodyTranslator(
+            chunk_chars=SCRAPER_CONFIG["body_chunk_chars"], rate=1e9, burst=1e9,
+            concurrency=SCRAPER_CONFIG["body_translation_concurrency"], translator_factory=StubTranslator
+        )
+        stages["body_translation"] = [lambda body=body: body_translator.translate_many([body]) for body in bodies]
+
+    if titles:
+        stages["translation_cold"] = [translate_cold]
+        stages["translation_cached"] = [lambda: warm_translator.translate_many(titles)]
+        stages["word_analysis"] = [lambda: repeated_words(count_words(translated), threshold=2)]
+
+    # local_test.py checks on the probe result a browser would return for the listing
+    checks = []
+    for html in listings:
+        page = parse_html(html)
+        article_tags = page.select("article")
+        article_titles = []
+        for article in article_tags[:5]:
+            heading = article.select_one("h1, h2, h3")
+            article_titles.append(heading.get_text().strip() if heading else None)
+        source = html.decode("utf-8", "replace").lower()
+        probe = {
+            "title": page.title.get_text() if page.title else "",
+            "article_count": len(article_tags),
+            "article_titles": article_titles,
+            "indicators_found": [i for i in TEST_CONFIG["spanish_indicators"] if i in source],
+            "metrics": None
+        }
+        checks.append(lambda probe=probe: validate_page(probe))
+    stages["local_test_checks"] = checks
+
+    if images:
+        server = FixtureServer(("127.0.0.1", 0), "replay", store)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        local = f"http://127.0.0.1:{server.server_address[1]}/__host__/"
+
+        def persist_image(url):
+            root = os.path.join(workdir, f"images_{next(counter)}")
+            image_store = ImageStore(root)
+            blob_path = image_store.fetch(local + url.split("://", 1)[1], log=lambda line: None)
+            image_store.link(blob_path, os.path.join(root, "cover" + os.path.splitext(blob_path)[1]))
+
+        stages["image_persistence"] = [lambda url=url: persist_image(url) for url in images]
+
+    return {name: ops for name, ops in stages.items() if ops}
+
+
+def compare(results, baseline, threshold):
+    """Return the stages whose p50 regressed past threshold"""
+    regressions = []
+    for name, stats in results.items():
+        previous = baseline.get(name)
+        if previous and stats["p50_ms"] > previous["p50_ms"] * (1 + threshold):
+            regressions.append((name, previous["p50_ms"], stats["p50_ms"]))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the scraping pipeline stage by stage")
+    parser.add_argument("fixtures_dir")
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed p50 slowdown, 0.25 = 25%%")
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args()
+
+    store, listings, articles, images = load_fixtures(args.fixtures_dir)
+    if not listings and not articles:
+        print(f"[FAIL] No recorded pages found in {args.fixtures_dir}")
+        return 1
+
+    print("=" * 80)
+    print(f"PIPELINE BENCHMARK - {len(listings)} listing, {len(articles)} articles, "
+          f"{len(images)} images x {args.iterations} iterations")
+    print("=" * 80)
+    print(f"{'Stage':<22}{'Ops':>7}{'Ops/s':>11}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}")
+
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        for name, ops in build_stages(store, listings, articles, images, workdir).items():
+            stats = summarize(time_ops(ops, args.iterations))
+            results[name] = stats
+            print(f"{name:<22}{stats['ops']:>7}{stats['throughput']:>11.1f}"
+                  f"{stats['p50_ms']:>10.2f}{stats['p90_ms']:>10.2f}{stats['p99_ms']:>10.2f}")
+
+    print("-" * 80)
+    if args.update_baseline or not os.path.exists(args.baseline):
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"[INFO] Baseline saved to {args.baseline}")
+        return 0
+
+    with open(args.baseline, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, args.threshold)
+    for name, before, after in regressions:
+        print(f"[FAIL] {name}: p50 {before:.2f} ms -> {after:.2f} ms (+{(after / before - 1) * 100:.0f}%)")
+    if regressions:
+        return 1
+    print(f"[OK] No stage regressed more than {args.threshold * 100:.0f}% against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
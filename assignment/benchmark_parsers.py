@@ -0,0 +1,155 @@
+"""
+HTML Parser Benchmark
+=====================
+Compares the parser backends, with and without scoped parsing, on saved
+El País pages, plus the scoped parse with a selector plan as main.py runs it.
+Every variant must extract exactly what a full html.parser parse extracts,
+including the chosen cover rendition; any mismatch fails the run. The plan
+variant also differs when saved pages of one section use different content
+layouts, since the learned selector then skips alternatives. A built-in
+<picture> page checks the rendition choice on every backend first.
+
+Usage:
+    python benchmark_parsers.py --save fixtures/pages   # save live pages
+    python benchmark_parsers.py fixtures/pages --repeat 20
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+import requests
+
+from extractors import (
+    LISTING_SCOPE, ARTICLE_SCOPE, parse_listing, extract_content, find_cover_rendition
+)
+from page_parser import available_backends, parse_html
+from scraper_config import SCRAPER_CONFIG
+from selector_plan import SelectorPlan
+
+# lxml nests the <img> inside the <source> elements of a <picture>
+PICTURE_PAGE = (
+    '<html><body><div class="a_c"><div class="a_m-p"><p>Body</p></div></div>'
+    '<figure class="a_m-media"><picture>'
+    '<source type="image/webp" srcset="/img/cover_800.webp 800w, /img/cover_1200.webp 1200w">'
+    '<source type="image/png" srcset="/img/cover_1300.png 1300w">'
+    '<img src="/img/cover.jpg" srcset="/img/cover_1300.png 1300w" width="640">'
+    '</picture></figure></body></html>'
+)
+PICTURE_RENDITION = "/img/cover_1200.webp"
+
+
+def save_pages(pages_dir, count=5):
+    """Download the Opinion listing and its first articles into pages_dir"""
+    os.makedirs(pages_dir, exist_ok=True)
+    session = requests.Session()
+    session.headers.update(SCRAPER_CONFIG["headers"])
+
+    listing = session.get(SCRAPER_CONFIG["listing_url"], timeout=SCRAPER_CONFIG["request_timeout"])
+    listing.raise_for_status()
+    with open(os.path.join(pages_dir, "listing_opinion.html"), "wb") as f:
+        f.write(listing.content)
+
+    entries = parse_listing(parse_html(listing.content, "html.parser"), SCRAPER_CONFIG["base_url"], count)
+    for entry in entries:
+        if not entry["url"]:
+            continue
+        response = session.get(entry["url"], timeout=SCRAPER_CONFIG["request_timeout"])
+        response.raise_for_status()
+        with open(os.path.join(pages_dir, f"article_{entry['idx']}.html"), "wb") as f:
+            f.write(response.content)
+    print(f"[OK] Saved listing and {len(entries)} articles to {pages_dir}")
+
+
+def extract(markup, is_listing, backend, scoped, plan=None):
+    """Parse one page and run the same extraction main.py runs on it"""
+    if is_listing:
+        page = parse_html(markup, backend, LISTING_SCOPE if scoped else None)
+        return parse_listing(page, SCRAPER_CONFIG["base_url"], SCRAPER_CONFIG["max_articles"])
+    page = parse_html(markup, backend, ARTICLE_SCOPE if scoped else None)
+    # Every saved article counts as one Opinion page for the plan
+    url = SCRAPER_CONFIG["listing_url"] + "article"
+    return extract_content(page, plan, url), find_cover_rendition(
+        page, SCRAPER_CONFIG["base_url"], SCRAPER_CONFIG["image_target_width"], SCRAPER_CONFIG["image_formats"],
+        plan, url
+    )
+
+
+def check_picture_renditions():
+    """Every backend, scoped or not, must pick the same <picture> source rendition"""
+    expected = SCRAPER_CONFIG["base_url"] + PICTURE_RENDITION
+    ok = True
+    for backend in available_backends():
+        for scoped in (False, True):
+            rendition, _ = extract(PICTURE_PAGE, False, backend, scoped)[1]
+            if rendition != expected:
+                ok = False
+                print(f"[FAIL] {backend}{' (scoped)' if scoped else ''}: picked {rendition}, expected {expected}")
+    if ok:
+        print(f"[OK] <picture> rendition identical on {', '.join(available_backends())}")
+    return ok
+
+
+def benchmark(pages_dir, repeat):
+    """Time every backend/scope variant and verify identical extraction"""
+    pages = []
+    for name in sorted(os.listdir(pages_dir)):
+        if name.endswith(".html"):
+            with open(os.path.join(pages_dir, name), "rb") as f:
+                pages.append((name, name.startswith("listing"), f.read()))
+    if not pages:
+        print(f"[FAIL] No .html pages found in {pages_dir}")
+        return False
+
+    # The plan starts empty and learns over the repeats, like main.py across runs
+    plan = SelectorPlan(os.path.join(tempfile.mkdtemp(), "selector_plan.json"))
+    variants = [(backend, scoped, None) for backend in available_backends() for scoped in (False, True)]
+    variants += [(backend, True, plan) for backend in available_backends()]
+    expected = {name: extract(markup, is_listing, "html.parser", False) for name, is_listing, markup in pages}
+
+    print("=" * 70)
+    print(f"PARSER BENCHMARK - {len(pages)} pages x {repeat} repeats")
+    print("=" * 70)
+    print(f"{'Variant':<30}{'Median/page':>15}{'Total':>12}{'Speedup':>12}")
+
+    baseline = None
+    all_match = True
+    for backend, scoped, variant_plan in variants:
+        label = f"{backend}{' (scoped)' if scoped else ''}{' + plan' if variant_plan else ''}"
+        timings = []
+        for name, is_listing, markup in pages:
+            for _ in range(repeat):
+                start = time.perf_counter()
+                result = extract(markup, is_listing, backend, scoped, variant_plan)
+                timings.append(time.perf_counter() - start)
+            if result != expected[name]:
+                all_match = False
+                print(f"[FAIL] {label}: extraction differs on {name}")
+
+        total = sum(timings) / repeat
+        if baseline is None:
+            baseline = total
+        print(f"{label:<30}{statistics.median(timings) * 1000:>12.2f} ms{total * 1000:>9.1f} ms{baseline / total:>11.2f}x")
+
+    print("-" * 70)
+    print("[OK] All variants extract identical results" if all_match else "[FAIL] Extraction mismatch")
+    return all_match
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark HTML parser backends on saved pages")
+    parser.add_argument("pages_dir", nargs="?", default=os.path.join("fixtures", "pages"))
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--save", action="store_true", help="download live pages into pages_dir first")
+    args = parser.parse_args()
+
+    if args.save:
+        save_pages(args.pages_dir)
+    renditions_ok = check_picture_renditions()
+    return 0 if benchmark(args.pages_dir, args.repeat) and renditions_ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,192 @@
+# Multi-section crawl frontier
+# Seed section pages are fetched, their article links and pagination links are
+# canonicalized, deduplicated and queued in a SQLite frontier, and the queued
+# articles are handed to main.py's per-article extraction. Pagination depth and
+# the number of articles per run are capped, requests are paced per host by
+# the fetcher's rate limiter, and an interrupted crawl resumes from the
+# persisted frontier. Articles that could not be extracted stay queued for a
+# limited number of attempts. Article URLs are deduplicated without their query string;
+# section pages keep it, since it may carry the page number.
+
+import os
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin, urlsplit
+
+from article_store import canonical_url
+from extractors import LISTING_SELECTOR, parse_listing
+from readiness import ReadinessPredicate
+
+SECTION = "section"
+ARTICLE = "article"
+
+
+class CrawlFrontier:
+    """Persisted queue of section and article URLs, deduplicated by canonical URL"""
+
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS frontier ("
+            " url TEXT PRIMARY KEY, kind TEXT NOT NULL, depth INTEGER NOT NULL, title TEXT,"
+            " section TEXT, state TEXT NOT NULL DEFAULT 'pending', discovered_at REAL NOT NULL,"
+            " attempts INTEGER NOT NULL DEFAULT 0)"
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(frontier)")}
+        if "attempts" not in columns:
+            self._conn.execute("ALTER TABLE frontier ADD COLUMN attempts INTEGER NOT NULL DEFAULT 0")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS frontier_state ON frontier (kind, state, discovered_at)")
+        self._conn.commit()
+
+    def start(self, seeds):
+        """Resume an interrupted crawl, or queue the seeds for a new one; return True when resuming
+
+        Articles only waiting for a retry do not hold back a new crawl.
+        """
+        with self._lock, self._conn:
+            pending = self._conn.execute(
+                "SELECT COUNT(*) FROM frontier WHERE state = 'pending' AND (kind = ? OR attempts = 0)", (SECTION,)
+            ).fetchone()[0]
+            if pending:
+                return True
+            # Sections are revisited on every crawl; seen articles stay deduplicated
+            self._conn.execute("DELETE FROM frontier WHERE kind = ?", (SECTION,))
+        self.add_many([(seed, SECTION, 0, None, canonical_url(seed, keep_query=True)) for seed in seeds])
+        return False
+
+    def add_many(self, items):
+        """Queue (url, kind, depth, title, section) items not seen before; return how many were new"""
+        now = time.time()
+        with self._lock, self._conn:
+            before = self._conn.total_changes
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO frontier (url, kind, depth, title, section, discovered_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                [(canonical_url(url, keep_query=kind == SECTION), kind, depth, title, section, now)
+                 for url, kind, depth, title, section in items]
+            )
+            return self._conn.total_changes - before
+
+    def known(self, urls):
+        """Canonical article URLs of urls already in the frontier"""
+        keys = [canonical_url(url) for url in urls]
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT url FROM frontier WHERE url IN ({', '.join('?' for _ in keys)})", keys
+            ).fetchall() if keys else []
+        return {row[0] for row in rows}
+
+    def pending(self, kind, limit=-1):
+        """Pending items of one kind in discovery order"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT url, depth, title, section FROM frontier WHERE kind = ? AND state = 'pending'"
+                " ORDER BY discovered_at, rowid LIMIT ?", (kind, limit)
+            ).fetchall()
+        return [dict(zip(("url", "depth", "title", "section"), row)) for row in rows]
+
+    def count_pending(self, kind):
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM frontier WHERE kind = ? AND state = 'pending'", (kind,)
+            ).fetchone()[0]
+
+    def mark_many(self, urls, state):
+        """Set the state ('done' or 'failed') of queued URLs, as returned by pending(), in one transaction"""
+        with self._lock, self._conn:
+            self._conn.executemany("UPDATE frontier SET state = ? WHERE url = ?", [(state, url) for url in urls])
+
+    def retry_many(self, urls, max_attempts):
+        """Count a failed attempt on queued URLs; they stay pending until max_attempts, then fail"""
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "UPDATE frontier SET attempts = attempts + 1,"
+                " state = CASE WHEN attempts + 1 >= ? THEN 'failed' ELSE 'pending' END WHERE url = ?",
+                [(max_attempts, url) for url in urls]
+            )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def explore_section(fetcher, item, config, ready, log=print):
+    """Fetch one section page; return (article entries, next page URLs) or None on failure"""
+    url = item["url"]
+    try:
+        result = fetcher.fetch(url, ready, log=log, revalidate=False)
+    except Exception as e:
+        log(f"❌ Error fetching section page {url}: {e}")
+        return None
+    finally:
+        # Section pages are never remembered, so their validators are not kept
+        fetcher.release(url)
+    page = result.page
+
+    origin = "{0.scheme}://{0.netloc}".format(urlsplit(url))
+    articles = [entry for entry in parse_listing(page, origin, limit=None) if entry["url"]]
+
+    # Pagination: explicit rel=next links plus numbered pages under the same section
+    section_path = urlsplit(item["section"]).path
+    pattern = re.compile(config["pagination_pattern"])
+    links = [urljoin(url, link["href"]) for link in page.select(config["pagination_selector"]) if link.get("href")]
+    links += [target for target in (urljoin(url, link["href"]) for link in page.select("a[href]"))
+              if pattern.search(urlsplit(target).path)]
+    next_pages = []
+    for target in links:
+        target = canonical_url(target, keep_query=True)
+        parts = urlsplit(target)
+        if (parts.netloc == urlsplit(url).netloc and parts.path.startswith(section_path)
+                and target != url and target not in next_pages):
+            next_pages.append(target)
+    return articles, next_pages
+
+
+def crawl(fetcher, frontier, config, concurrency, readiness_timeout=10, log=print):
+    """Discover articles from the seed sections; return main.py listing entries for the pending articles"""
+    ready = ReadinessPredicate("section", LISTING_SELECTOR, timeout=readiness_timeout)
+    allowed_hosts = {urlsplit(seed).netloc.lower() for seed in config["seed_sections"]}
+    max_articles = config["max_articles"]
+
+    if frontier.start(config["seed_sections"]):
+        log(f"♻️ Resuming crawl: {frontier.count_pending(ARTICLE)} articles and "
+            f"{frontier.count_pending(SECTION)} section pages still queued")
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        while frontier.count_pending(ARTICLE) < max_articles:
+            sections = frontier.pending(SECTION, concurrency)
+            if not sections:
+                break
+            explored = executor.map(lambda item: explore_section(fetcher, item, config, ready, log), sections)
+            for item, found in zip(sections, explored):
+                if found is None:
+                    frontier.mark_many([item["url"]], "failed")
+                    continue
+                articles, next_pages = found
+
+                # Only new, same-site articles, up to the per-run limit
+                articles = [entry for entry in articles if urlsplit(entry["url"]).netloc.lower() in allowed_hosts]
+                seen = frontier.known([entry["url"] for entry in articles])
+                fresh = []
+                for entry in articles:
+                    key = canonical_url(entry["url"])
+                    if key not in seen:
+                        seen.add(key)
+                        fresh.append((entry["url"], ARTICLE, item["depth"] + 1, entry["title"], item["section"]))
+                room = max(0, max_articles - frontier.count_pending(ARTICLE))
+                added = frontier.add_many(fresh[:room])
+
+                if item["depth"] < config["max_depth"]:
+                    frontier.add_many([(page_url, SECTION, item["depth"] + 1, None, item["section"])
+                                       for page_url in next_pages])
+                frontier.mark_many([item["url"]], "done")
+                log(f"🧭 {item['url']} (depth {item['depth']}): {added} new articles, {len(next_pages)} pages linked")
+
+    queued = frontier.pending(ARTICLE, max_articles)
+    log(f"📚 {len(queued)} articles queued for extraction")
+    return [{"idx": idx, "title": item["title"], "url": item["url"]} for idx, item in enumerate(queued, start=1)]
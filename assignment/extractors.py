@@ -0,0 +1,203 @@
+# Page extraction helpers
+# Selectors and parsing logic shared by main.py and the fetch layer
+
+from bs4 import SoupStrainer
+
+from renditions import choose_rendition, rendition_candidates
+
+# Selectors used on El País pages
+LISTING_SELECTOR = 'article'
+CONTENT_SELECTOR = 'div.a_c div.a_m-p > p, div.a_c article > p, div#fusion-app p, p.c_d'
+# The same alternatives one by one, for selector plans
+CONTENT_SELECTORS = [selector.strip() for selector in CONTENT_SELECTOR.split(',')]
+IMAGE_SELECTORS = [
+    'figure.a_m-media img',
+    'div.a_m-media img',
+    'img.a_m-media__img',
+    'figure img',
+    'div.c_m img',
+    'img[src*="elpais"]'
+]
+
+
+# Classes/ids of the containers the content and image selectors start from
+ARTICLE_SCOPE_DIV_CLASSES = {'a_c', 'a_m-media', 'c_m'}
+ARTICLE_SCOPE_DIV_IDS = {'fusion-app'}
+
+
+def _in_article_scope(name, attrs=None):
+    """SoupStrainer filter keeping every subtree CONTENT_SELECTOR, IMAGE_SELECTORS or the headline can match"""
+    if attrs is None and hasattr(name, "attrs"):
+        # Newer bs4 releases pass the Tag itself
+        name, attrs = name.name, name.attrs
+    attrs = attrs or {}
+    classes = attrs.get('class') or []
+    if isinstance(classes, str):
+        classes = classes.split()
+
+    if name == 'div':
+        return bool(ARTICLE_SCOPE_DIV_CLASSES.intersection(classes)) or attrs.get('id') in ARTICLE_SCOPE_DIV_IDS
+    if name == 'p':
+        return 'c_d' in classes
+    return name in ('figure', 'picture', 'img', 'h1')
+
+
+class _ArticleScope(SoupStrainer):
+    """Strainer that decides on tag name and attributes with every bs4 release
+
+    Before 4.13, bs4 calls the filter with (name, attrs). From 4.13 on, a
+    callable name filter only gets the tag name, which would drop every
+    div.a_c and #fusion-app container; the parser asks allow_tag_creation
+    instead, so the same check runs there.
+    """
+
+    def allow_tag_creation(self, nsprefix, name, attrs):
+        return _in_article_scope(name, attrs)
+
+
+# Scoped parses build only the subtrees the extractors read
+LISTING_SCOPE = SoupStrainer(LISTING_SELECTOR)
+ARTICLE_SCOPE = _ArticleScope(_in_article_scope)
+
+
+def absolute_url(url, base_url):
+    """Turn a protocol-relative or site-relative URL into an absolute one"""
+    if url.startswith("//"):
+        return "https:" + url
+    if not url.startswith("http"):
+        return base_url + url
+    return url
+
+
+def parse_listing(listing_page, base_url, limit):
+    """Extract index, title and link of the first articles on the listing page"""
+    entries = []
+    for idx, article in enumerate(listing_page.select(LISTING_SELECTOR)[:limit], start=1):
+        title_tag = article.find('h1') or article.find('h2')
+        if not title_tag:
+            continue
+
+        link_tag = article.find('a')
+        url = None
+        if link_tag and link_tag.get('href'):
+            url = absolute_url(link_tag['href'], base_url)
+
+        entries.append({
+            "idx": idx,
+            "title": title_tag.get_text().strip(),
+            "url": url
+        })
+    return entries
+
+
+def _paragraphs(article_page, selector):
+    """The non-empty paragraphs matched by selector"""
+    texts = (p.get_text().strip() for p in article_page.select(selector))
+    return [text for text in texts if text]
+
+
+def _paragraph_text(article_page, selector):
+    """Join the non-empty paragraphs matched by selector"""
+    return "\n".join(_paragraphs(article_page, selector))
+
+
+def _content_paragraphs(article_page, leader=None):
+    """Non-empty content paragraphs in document order, the selector to record for them, and whether leader matched
+
+    A plan's leading selector list runs alone. Only when it matches nothing is
+    the union of every CONTENT_SELECTORS alternative selected, and the
+    alternatives that matched are joined into the selector to learn.
+    """
+    if leader:
+        paragraphs = _paragraphs(article_page, leader)
+        if paragraphs:
+            return paragraphs, leader, True
+    tags = [p for p in article_page.select(CONTENT_SELECTOR) if p.get_text().strip()]
+    matched = [selector for selector in CONTENT_SELECTORS if any(p.css.match(selector) for p in tags)]
+    return [p.get_text().strip() for p in tags], ", ".join(matched) or None, False
+
+
+def _image_tag(article_page, selector):
+    img_tag = article_page.select_one(selector)
+    # Wrapped because a Tag without children is falsy
+    return (img_tag,) if img_tag is not None and img_tag.get("src") else None
+
+
+def _cover_tag(article_page, plan, url):
+    """The cover <img> tag, found through the selector plan if one is given"""
+    if plan is not None:
+        found = plan.first_match(article_page, url, "image", IMAGE_SELECTORS, _image_tag)
+    else:
+        found = next(filter(None, (_image_tag(article_page, selector) for selector in IMAGE_SELECTORS)), None)
+    return found[0] if found else None
+
+
+def extract_content(article_page, plan=None, url=None):
+    """Join the non-empty content paragraphs of an article page
+
+    The content is the union of the CONTENT_SELECTOR alternatives, in document
+    order. With a SelectorPlan, the combination of alternatives learned for
+    the page's template is selected first and the full union only on a miss.
+    """
+    if plan is not None:
+        paragraphs, selector, first_hit = _content_paragraphs(article_page, plan.leader(url, "content"))
+        plan.record(url, "content", selector, first_hit)
+        return "\n".join(paragraphs)
+    return _paragraph_text(article_page, CONTENT_SELECTOR)
+
+
+def find_cover_image(article_page, base_url, plan=None, url=None):
+    """Return the absolute URL of the article cover image, or None"""
+    # Try multiple selectors for images in El País articles
+    img_tag = _cover_tag(article_page, plan, url)
+    # Handle relative URLs
+    return absolute_url(img_tag["src"], base_url) if img_tag else None
+
+
+def find_cover_rendition(article_page, base_url, target_width, formats, plan=None, url=None):
+    """Return (best rendition URL, default src URL) of the cover image, or (None, None)"""
+    img_tag = _cover_tag(article_page, plan, url)
+    if img_tag is None:
+        return None, None
+    default_url = absolute_url(img_tag["src"], base_url)
+    rendition = choose_rendition(img_tag, target_width, formats)
+    return (absolute_url(rendition, base_url) if rendition else default_url), default_url
+
+
+def extract_record(article_page, base_url, content_selector=None, image_selectors=IMAGE_SELECTORS,
+                   target_width=None, formats=()):
+    """Extract an article page into a plain dict that can leave a worker process
+
+    Holds the headline, the content paragraphs, the cover rendition, its default
+    src and every rendition candidate, plus the content and image selectors that
+    matched (and whether each was the one tried first), for the selector plan.
+    content_selector is the plan's leading content selector, if any.
+    """
+    record = {
+        "title": None, "paragraphs": [], "content_selector": None, "content_first": False,
+        "image_url": None, "default_image_url": None, "image_candidates": [],
+        "image_selector": None, "image_first": False
+    }
+    heading = article_page.find('h1')
+    if heading is not None:
+        record["title"] = heading.get_text().strip() or None
+
+    record["paragraphs"], record["content_selector"], record["content_first"] = _content_paragraphs(
+        article_page, content_selector
+    )
+
+    for position, selector in enumerate(image_selectors):
+        found = _image_tag(article_page, selector)
+        if found:
+            img_tag = found[0]
+            default_url = absolute_url(img_tag["src"], base_url)
+            rendition = choose_rendition(img_tag, target_width, formats) if target_width else None
+            record.update(
+                image_url=absolute_url(rendition, base_url) if rendition else default_url,
+                default_image_url=default_url,
+                image_candidates=[(absolute_url(url, base_url), width, fmt)
+                                  for url, width, fmt in rendition_candidates(img_tag)],
+                image_selector=selector, image_first=position == 0
+            )
+            break
+    return record
@@ -0,0 +1,66 @@
+# Fast-load mode for local Chrome drivers
+# The scraper and the local test only need the DOM, so pages are loaded with an
+# eager (or none) page-load strategy and requests for ads, trackers, fonts,
+# media and images are blocked at the network level through the DevTools
+# protocol. The performance log tells how many requests were blocked and how
+# many bytes were still transferred.
+
+import json
+
+# Resource types mapped to the URL patterns that block them (Network.setBlockedURLs
+# matches URLs only, so types are expressed through their file extensions)
+RESOURCE_TYPE_PATTERNS = {
+    "Image": ["*.jpg*", "*.jpeg*", "*.png*", "*.gif*", "*.webp*", "*.avif*", "*.svg*", "*.ico*"],
+    "Media": ["*.mp4*", "*.webm*", "*.m3u8*", "*.mp3*", "*.ts?*"],
+    "Font": ["*.woff*", "*.ttf*", "*.otf*", "*.eot*"],
+    "Stylesheet": ["*.css*"]
+}
+
+
+def blocked_url_patterns(config):
+    """Every URL pattern to block: the explicit deny list plus the denied resource types"""
+    patterns = list(config.get("blocked_url_patterns", []))
+    for resource_type in config.get("blocked_resource_types", []):
+        patterns.extend(RESOURCE_TYPE_PATTERNS.get(resource_type, []))
+    return list(dict.fromkeys(patterns))
+
+
+def apply_options(options, config):
+    """Set the page-load strategy and enable the performance log on Chrome options"""
+    options.page_load_strategy = config.get("page_load_strategy", "eager")
+    options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+    return options
+
+
+def enable_blocking(driver, config):
+    """Start blocking the configured requests on a running Chrome driver"""
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": blocked_url_patterns(config)})
+
+
+def read_network_usage(driver):
+    """Requests sent, requests blocked and bytes received since the log was last read"""
+    usage = {"requests": 0, "blocked": 0, "bytes": 0}
+    try:
+        entries = driver.get_log("performance")
+    except Exception:
+        # Performance logging not enabled on this driver
+        return usage
+    for entry in entries:
+        message = json.loads(entry["message"])["message"]
+        method = message.get("method")
+        params = message.get("params", {})
+        if method == "Network.requestWillBeSent":
+            usage["requests"] += 1
+        elif method == "Network.loadingFinished":
+            usage["bytes"] += params.get("encodedDataLength", 0)
+        elif method == "Network.loadingFailed" and params.get("blockedReason"):
+            usage["blocked"] += 1
+    return usage
+
+
+def add_usage(total, usage):
+    """Accumulate one read_network_usage result into a running total"""
+    for key, value in usage.items():
+        total[key] = total.get(key, 0) + value
+    return total
@@ -0,0 +1,286 @@
+# HTTP-first page fetcher
+# Pages are fetched with plain HTTP; a Selenium Chrome driver is only started
+# when the HTTP response fails the page's readiness predicate or the request
+# cannot connect. An HTTP error status is raised to the caller, since the
+# browser would get the same error page. The fetcher is
+# safe to share between threads: each thread gets its own HTTP session and
+# browser fallbacks borrow a driver from a bounded pool. With an HttpCache
+# attached, pages are revalidated with conditional requests and a 304 hands
+# back the result parsed on a previous run. With a fast-load config, browser
+# drivers load pages eagerly and block images, fonts, media and trackers. A
+# rate limiter paces every request per host. With a parse pool, fetch() can
+# hand the raw HTML to a worker process that parses and extracts it and return
+# at once; the worker's record is collected later, so the fetching thread can
+# move on to the next page while this one is parsed.
+
+import queue
+import threading
+from collections import namedtuple
+import requests
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+from webdriver_manager.chrome import ChromeDriverManager
+
+from fast_load import add_usage, apply_options, enable_blocking, read_network_usage
+from page_parser import parse_html
+from readiness import ReadinessWaiter
+from tracing import tracer
+
+
+# page is the freshly parsed soup; parsed is the cached result after a 304;
+# record is a PendingRecord for what a parse pool worker extracts
+FetchResult = namedtuple("FetchResult", ["page", "parsed", "record"], defaults=[None])
+
+
+class PendingRecord:
+    """A page handed to the parse pool; result() waits for the worker and falls back to the browser"""
+
+    def __init__(self, fetcher, url, ready, extract, future=None, response=None):
+        self.fetcher = fetcher
+        self.url = url
+        self.ready = ready
+        self.extract = extract
+        self.future = future
+        self.response = response
+
+    def result(self, log=print):
+        """The extracted record, rendering the page in a browser if the HTTP HTML failed ready"""
+        if self.future is not None:
+            with tracer.span("parse_wait"):
+                record = self.future.result()
+            if record is not None:
+                self.fetcher._accept(self.response, self.url)
+                return record
+            log(f"⚠️ HTTP response lacks {self.ready!r}, using browser for: {self.url}")
+
+        page_source = self.fetcher._render(self.url, self.ready, log)
+        with tracer.span("parse_pool"):
+            # The browser already waited on ready, so the rendered DOM is taken as is
+            return self.fetcher.parse_pool.run(self.extract, page_source, None)
+
+
+class PageFetcher:
+    """Fetch pages over HTTP and fall back to a browser only when needed"""
+
+    def __init__(self, headers=None, timeout=15, max_browsers=1, http_cache=None,
+                 parser_backend="auto", fast_load=None, rate_limiter=None, parse_pool=None):
+        self.headers = headers or {}
+        self.parse_pool = parse_pool
+        self.rate_limiter = rate_limiter
+        self.fast_load = fast_load
+        self.network = {}
+        self.parser_backend = parser_backend
+        self.timeout = timeout
+        self.readiness = ReadinessWaiter()
+        self.max_browsers = max_browsers
+        self.http_cache = http_cache
+        self.stats = {"http": 0, "not_modified": 0, "browser": 0}
+        self.browser_urls = []
+        # Validators of fetched pages, until remember() or release()
+        self._validators = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._sessions = []
+        self._drivers = []
+        self._idle_drivers = queue.Queue()
+
+    @property
+    def browser_started(self):
+        """True once at least one browser fallback has been needed"""
+        return bool(self._drivers)
+
+    def _session(self):
+        """Return the HTTP session of the calling thread"""
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            session.headers.update(self.headers)
+            self._local.session = session
+            with self._lock:
+                self._sessions.append(session)
+        return session
+
+    def _count(self, source, url=None):
+        with self._lock:
+            self.stats[source] += 1
+            if url:
+                self.browser_urls.append(url)
+
+    def fetch(self, url, ready, log=print, revalidate=True, scope=None, extract=None):
+        """Return a FetchResult, using the browser if the HTTP HTML fails the ready predicate
+
+        Raises requests.HTTPError on a 4xx/5xx response instead of starting a browser.
+
+        With extract and a parse pool, extract(markup, ready) is queued on a worker
+        process instead of the parse and the result carries a PendingRecord;
+        extract must be picklable and return None when the markup fails ready.
+        Queuing blocks while the pool has its maximum of pages in flight.
+        """
+        with tracer.span("fetch", url=url):
+            if extract is not None and self.parse_pool is not None:
+                return self._fetch_record(url, ready, log, revalidate, extract)
+            return self._fetch(url, ready, log, revalidate, scope)
+
+    def _http_get(self, url, revalidate):
+        """GET url; return (response, cached result) where the latter is set on a usable 304"""
+        headers = self.http_cache.validators(url) if self.http_cache and revalidate else {}
+        if self.rate_limiter:
+            with tracer.span("rate_wait"):
+                self.rate_limiter.acquire(url)
+        with tracer.span("http_get"):
+            response = self._session().get(url, headers=headers, timeout=self.timeout)
+        if response.status_code == 304 and headers:
+            parsed = self.http_cache.get(url)
+            if parsed is not None:
+                self._count("not_modified")
+                with self._lock:
+                    self._validators[url] = (headers.get("If-None-Match"), headers.get("If-Modified-Since"))
+                return response, FetchResult(None, parsed)
+        response.raise_for_status()
+        return response, None
+
+    def _accept(self, response, url):
+        """Count an HTTP page that passed its predicate and keep its validators"""
+        self._count("http")
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if etag or last_modified:
+            with self._lock:
+                self._validators[url] = (etag, last_modified)
+
+    def _fetch(self, url, ready, log, revalidate, scope):
+        try:
+            response, cached = self._http_get(url, revalidate)
+            if cached:
+                return cached
+            with tracer.span("parse"):
+                page = parse_html(response.content, self.parser_backend, scope)
+            if ready.matches(page):
+                self._accept(response, url)
+                return FetchResult(page, None)
+            log(f"⚠️ HTTP response lacks {ready!r}, using browser for: {url}")
+        except requests.exceptions.HTTPError:
+            # A missing or refused page cannot become ready in a browser either
+            raise
+        except requests.exceptions.RequestException as e:
+            log(f"⚠️ HTTP fetch failed ({e}), using browser for: {url}")
+
+        page_source = self._render(url, ready, log)
+        with tracer.span("parse"):
+            return FetchResult(parse_html(page_source, self.parser_backend, scope), None)
+
+    def _fetch_record(self, url, ready, log, revalidate, extract):
+        try:
+            response, cached = self._http_get(url, revalidate)
+            if cached:
+                return cached
+            with tracer.span("parse_submit"):
+                future = self.parse_pool.submit(extract, response.content, ready)
+            return FetchResult(None, None, PendingRecord(self, url, ready, extract, future, response))
+        except requests.exceptions.HTTPError:
+            # A missing or refused page cannot become ready in a browser either
+            raise
+        except requests.exceptions.RequestException as e:
+            log(f"⚠️ HTTP fetch failed ({e}), using browser for: {url}")
+        # Rendered when the record is collected
+        return FetchResult(None, None, PendingRecord(self, url, ready, extract))
+
+    def remember(self, url, parsed):
+        """Cache what was parsed from url under the validators of its last response"""
+        if self.http_cache is None:
+            return
+        with self._lock:
+            validators = self._validators.pop(url, None)
+        if validators is None:
+            # Browser-rendered or validator-less pages cannot be revalidated
+            self.http_cache.forget(url)
+        else:
+            self.http_cache.store(url, validators[0], validators[1], parsed)
+
+    def release(self, url):
+        """Drop the validators kept for url when its page will not be remembered"""
+        with self._lock:
+            self._validators.pop(url, None)
+
+    def _acquire_driver(self):
+        """Borrow an idle driver, starting a new one while the pool has room"""
+        while True:
+            try:
+                return self._idle_drivers.get(timeout=0.5)
+            except queue.Empty:
+                pass
+
+            with self._lock:
+                start_new = len(self._drivers) < self.max_browsers
+                if start_new:
+                    # Reserve the slot before the slow driver startup
+                    self._drivers.append(None)
+            if start_new:
+                break
+
+        # Setup Selenium only once a page actually needs it
+        try:
+            service = Service(ChromeDriverManager().install())
+            options = webdriver.ChromeOptions()
+            if self.fast_load:
+                apply_options(options, self.fast_load)
+            driver = webdriver.Chrome(service=service, options=options)
+            if self.fast_load:
+                enable_blocking(driver, self.fast_load)
+        except Exception:
+            with self._lock:
+                self._drivers.remove(None)
+            raise
+        with self._lock:
+            self._drivers[self._drivers.index(None)] = driver
+        return driver
+
+    def _render(self, url, ready, log=print):
+        """Load the page in a pooled Chrome and return the rendered DOM"""
+        with tracer.span("browser_fallback"):
+            with tracer.span("acquire_driver"):
+                driver = self._acquire_driver()
+            try:
+                if self.rate_limiter:
+                    with tracer.span("rate_wait"):
+                        self.rate_limiter.acquire(url)
+                with tracer.span("driver.get"):
+                    driver.get(url)
+                with tracer.span("readiness_wait", predicate=ready.name):
+                    if not self.readiness.wait(driver, ready):
+                        log(f"⚠️ Page still lacks {ready!r} after {ready.timeout}s: {url}")
+                with tracer.span("page_source"):
+                    page_source = driver.page_source
+                if self.fast_load:
+                    usage = read_network_usage(driver)
+                    with self._lock:
+                        add_usage(self.network, usage)
+            finally:
+                self._idle_drivers.put(driver)
+
+            self._count("browser", url)
+            return page_source
+
+    def report(self):
+        """Print how many pages were served over HTTP and how many needed a browser"""
+        total = sum(self.stats.values())
+        print(f"\n📡 Pages fetched: {total}")
+        print(f"   Plain HTTP: {self.stats['http']}")
+        print(f"   Not modified (304): {self.stats['not_modified']}")
+        print(f"   Browser fallback: {self.stats['browser']}")
+        for url in self.browser_urls:
+            print(f"   🧭 {url}")
+        if self.fast_load and self.network:
+            print(f"   ⚡ Fast load: {self.network['blocked']} of {self.network['requests']} requests blocked, "
+                  f"{self.network['bytes'] / 1024:.0f} KB transferred")
+
+    def close(self):
+        """Release the HTTP sessions and quit every browser that was started"""
+        for session in self._sessions:
+            session.close()
+        self._sessions = []
+        for driver in self._drivers:
+            if driver is not None:
+                driver.quit()
+        self._drivers = []
+        self._idle_drivers = queue.Queue()
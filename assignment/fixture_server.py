@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Record/Replay Fixture Server
+============================
+Serves El País pages, images and translator responses from disk so the
+scraper and local tests run offline and deterministically.
+
+record: proxies every request to the live site, saves the response, serves it
+replay: serves saved responses only (404 for anything not recorded), with
+        optional latency and bandwidth injection
+
+Point the pipeline at the server through the environment, no code changes:
+    ELPAIS_BASE_URL=http://127.0.0.1:8765
+    TRANSLATOR_BASE_URL=http://127.0.0.1:8765/__host__/translate.google.com/m
+
+Usage:
+    python fixture_server.py record fixtures/elpais
+    python fixture_server.py replay fixtures/elpais --latency-ms 80 --bandwidth-kbps 4000
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import requests
+
+DEFAULT_UPSTREAM = "https://elpais.com"
+HOST_PREFIX = "/__host__/"
+
+# Response headers worth keeping with a fixture
+KEPT_HEADERS = ["Content-Type", "ETag", "Last-Modified", "Cache-Control"]
+
+# Absolute (optionally JSON-escaped) and protocol-relative links to other hosts
+ABSOLUTE_LINK = re.compile(r'https?:(\\?/\\?/)([a-z0-9.-]+\.[a-z]{2,})', re.IGNORECASE)
+RELATIVE_LINK = re.compile(r'(["\'(=\s])//([a-z0-9.-]+\.[a-z]{2,})/', re.IGNORECASE)
+
+
+class FixtureStore:
+    """Recorded responses on disk: index.json plus one body file per response"""
+
+    def __init__(self, root):
+        self.root = root
+        self.index_path = os.path.join(root, "index.json")
+        self._lock = threading.Lock()
+        os.makedirs(os.path.join(root, "bodies"), exist_ok=True)
+        self.index = {}
+        if os.path.exists(self.index_path):
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                self.index = json.load(f)
+
+    def get(self, url):
+        """Return (entry, body) for a recorded URL, or (None, None)"""
+        with self._lock:
+            entry = self.index.get(url)
+        if entry is None:
+            return None, None
+        with open(os.path.join(self.root, "bodies", entry["body"]), 'rb') as f:
+            return entry, f.read()
+
+    def put(self, url, status, headers, body):
+        """Save a response and rewrite the index atomically"""
+        digest = hashlib.sha256(body).hexdigest()
+        body_path = os.path.join(self.root, "bodies", digest)
+        if not os.path.exists(body_path):
+            with open(body_path + ".tmp", 'wb') as f:
+                f.write(body)
+            os.replace(body_path + ".tmp", body_path)
+
+        entry = {"status": status, "headers": headers, "body": digest, "recorded_at": time.time()}
+        with self._lock:
+            self.index[url] = entry
+            with open(self.index_path + ".tmp", 'w', encoding='utf-8') as f:
+                json.dump(self.index, f, indent=2, sort_keys=True)
+            os.replace(self.index_path + ".tmp", self.index_path)
+        return entry
+
+
+class FixtureServer(ThreadingHTTPServer):
+    """HTTP server that records or replays upstream responses"""
+
+    daemon_threads = True
+
+    def __init__(self, address, mode, store, upstream=DEFAULT_UPSTREAM, latency=0.0, bandwidth=None):
+        super().__init__(address, FixtureHandler)
+        self.mode = mode
+        self.store = store
+        self.upstream = upstream.rstrip("/")
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.stats = {"served": 0, "recorded": 0, "missing": 0}
+        self.stats_lock = threading.Lock()
+
+    def upstream_url(self, path):
+        """Map a local request path to the upstream URL it stands for"""
+        if path.startswith(HOST_PREFIX):
+            return "https://" + path[len(HOST_PREFIX):]
+        return self.upstream + path
+
+    def count(self, key):
+        with self.stats_lock:
+            self.stats[key] += 1
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    server_version = "FixtureServer/1.0"
+
+    def do_GET(self):
+        self._respond(send_body=True)
+
+    def do_HEAD(self):
+        self._respond(send_body=False)
+
+    def _respond(self, send_body):
+        url = self.server.upstream_url(self.path)
+        entry, body = self.server.store.get(url)
+
+        if entry is None:
+            if self.server.mode == "replay":
+                self.server.count("missing")
+                self.send_error(404, f"Not recorded: {url}")
+                return
+            entry, body = self._record(url)
+            if entry is None:
+                return
+
+        if self.server.latency:
+            time.sleep(self.server.latency)
+
+        headers = entry["headers"]
+        etag = headers.get("ETag")
+        last_modified = headers.get("Last-Modified")
+        if ((etag and self.headers.get("If-None-Match") == etag)
+                or (last_modified and self.headers.get("If-Modified-Since") == last_modified)):
+            self.send_response(304)
+            self.end_headers()
+            self.server.count("served")
+            return
+
+        body = self._rewrite(body, headers.get("Content-Type", ""))
+        self.send_response(entry["status"])
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if send_body:
+            self._write_throttled(body)
+        self.server.count("served")
+
+    def _record(self, url):
+        """Fetch url from upstream and save it"""
+        forward = {name: self.headers[name] for name in ("User-Agent", "Accept", "Accept-Language") if self.headers.get(name)}
+        try:
+            response = requests.get(url, headers=forward, timeout=30)
+        except requests.exceptions.RequestException as e:
+            self.send_error(502, f"Upstream error: {e}")
+            return None, None
+
+        headers = {name: response.headers[name] for name in KEPT_HEADERS if name in response.headers}
+        entry = self.server.store.put(url, response.status_code, headers, response.content)
+        self.server.count("recorded")
+        print(f"[REC] {response.status_code} {url}")
+        return entry, response.content
+
+    def _rewrite(self, body, content_type):
+        """Point links in text bodies back at this server"""
+        if not any(kind in content_type for kind in ("text/", "json", "javascript", "xml")):
+            return body
+
+        local = f"http://{self.headers.get('Host', '%s:%d' % self.server.server_address[:2])}"
+        upstream_host = self.server.upstream.split("://", 1)[-1]
+        text = body.decode("utf-8", errors="surrogateescape")
+
+        def absolute(match):
+            slash = "\\/" if "\\" in match.group(1) else "/"
+            host = match.group(2)
+            if host == upstream_host:
+                return local.replace("/", slash)
+            return (local + HOST_PREFIX + host).replace("/", slash)
+
+        text = ABSOLUTE_LINK.sub(absolute, text)
+        text = RELATIVE_LINK.sub(lambda m: f"{m.group(1)}{local}{HOST_PREFIX}{m.group(2)}/", text)
+        return text.encode("utf-8", errors="surrogateescape")
+
+    def _write_throttled(self, body):
+        """Send the body, pacing it to the configured bandwidth"""
+        if not self.server.bandwidth:
+            self.wfile.write(body)
+            return
+        chunk_size = 16 * 1024
+        for offset in range(0, len(body), chunk_size):
+            chunk = body[offset:offset + chunk_size]
+            self.wfile.write(chunk)
+            time.sleep(len(chunk) / self.server.bandwidth)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record or replay network fixtures")
+    parser.add_argument("mode", choices=["record", "replay"])
+    parser.add_argument("fixtures_dir")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--upstream", default=DEFAULT_UPSTREAM)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="delay added to every response")
+    parser.add_argument("--bandwidth-kbps", type=float, default=None, help="throttle response bodies")
+    args = parser.parse_args()
+
+    bandwidth = args.bandwidth_kbps * 1000 / 8 if args.bandwidth_kbps else None
+    server = FixtureServer(
+        (args.host, args.port), args.mode, FixtureStore(args.fixtures_dir),
+        upstream=args.upstream, latency=args.latency_ms / 1000, bandwidth=bandwidth
+    )
+
+    base = f"http://{args.host}:{args.port}"
+    print("=" * 60)
+    print(f"FIXTURE SERVER - {args.mode.upper()} mode on {base}")
+    print("=" * 60)
+    print(f"Fixtures: {args.fixtures_dir} ({len(server.store.index)} recorded responses)")
+    print(f"export ELPAIS_BASE_URL={base}")
+    print(f"export TRANSLATOR_BASE_URL={base}{HOST_PREFIX}translate.google.com/m")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"\n[INFO] Served {server.stats['served']}, recorded {server.stats['recorded']}, "
+              f"missing {server.stats['missing']}")
+
+
+if __name__ == "__main__":
+    main()
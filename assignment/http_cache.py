@@ -0,0 +1,66 @@
+# Conditional-request HTTP cache
+# Stores the ETag/Last-Modified validators of each page together with the
+# result main.py parsed from it, so unchanged pages can be revalidated with a
+# cheap 304 instead of being downloaded and processed again.
+
+import json
+import os
+import sqlite3
+import threading
+import time
+
+
+class HttpCache:
+    """SQLite store of HTTP validators and parsed results keyed by URL"""
+
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS pages ("
+            " url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT,"
+            " parsed TEXT NOT NULL, stored_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def validators(self, url):
+        """Return the conditional request headers for url, if anything is cached"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT etag, last_modified FROM pages WHERE url = ?", (url,)
+            ).fetchone()
+        if row is None:
+            return {}
+
+        headers = {}
+        if row[0]:
+            headers["If-None-Match"] = row[0]
+        if row[1]:
+            headers["If-Modified-Since"] = row[1]
+        return headers
+
+    def get(self, url):
+        """Return the parsed result stored for url, or None"""
+        with self._lock:
+            row = self._conn.execute("SELECT parsed FROM pages WHERE url = ?", (url,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def store(self, url, etag, last_modified, parsed):
+        """Save the validators of a fresh response and what was parsed from it"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?)",
+                (url, etag, last_modified, json.dumps(parsed, ensure_ascii=False), time.time())
+            )
+            self._conn.commit()
+
+    def forget(self, url):
+        """Drop the cached entry for url"""
+        with self._lock:
+            self._conn.execute("DELETE FROM pages WHERE url = ?", (url,))
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,186 @@
+# Content-addressed cover image store
+# Images are streamed to disk in chunks and stored once under the SHA-256 of
+# their bytes; article folders only hold a link to the stored blob. Partial
+# downloads are resumed with a Range request, and every file appears through
+# an atomic rename so readers never see half-written images.
+
+import hashlib
+import os
+import shutil
+import threading
+import requests
+
+
+def image_extension(url, content_type):
+    """Pick a file extension from the image URL, falling back to its content type"""
+    if url.lower().endswith(('.jpg', '.jpeg')):
+        return '.jpg'
+    elif url.lower().endswith('.png'):
+        return '.png'
+    elif url.lower().endswith('.webp'):
+        return '.webp'
+
+    if 'jpeg' in content_type or 'jpg' in content_type:
+        return '.jpg'
+    elif 'png' in content_type:
+        return '.png'
+    elif 'webp' in content_type:
+        return '.webp'
+    return '.jpg'  # Default fallback
+
+
+class ImageStore:
+    """Store downloaded images by content hash and link them into article folders"""
+
+    def __init__(self, root, headers=None, timeout=15, chunk_size=64 * 1024):
+        self.root = root
+        self.headers = headers or {}
+        self.timeout = timeout
+        self.chunk_size = chunk_size
+        self.stats = {"downloaded": 0, "reused": 0, "resumed": 0, "bytes_saved": 0, "bytes_larger": 0}
+        self._lock = threading.Lock()
+        self._url_locks = {}
+        self._fetched = set()
+        for folder in ("blobs", "partial", "urls"):
+            os.makedirs(os.path.join(root, folder), exist_ok=True)
+
+    def _url_lock(self, url):
+        with self._lock:
+            return self._url_locks.setdefault(url, threading.Lock())
+
+    def _count(self, key, amount=1):
+        with self._lock:
+            self.stats[key] += amount
+
+    def fetch(self, url, referer=None, log=print):
+        """Return the blob path for url, downloading it only if it is not stored yet"""
+        url_key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        ref_path = os.path.join(self.root, "urls", url_key)
+
+        with self._url_lock(url):
+            blob_path = self._read_ref(ref_path)
+            if blob_path:
+                self._count("reused")
+                return blob_path
+
+            blob_path = self._download(url, url_key, referer, log)
+            _atomic_write(ref_path, os.path.relpath(blob_path, self.root))
+            with self._lock:
+                self._fetched.add(url)
+            return blob_path
+
+    def downloaded(self, url):
+        """Whether url was downloaded by this store, rather than taken from an earlier run"""
+        with self._lock:
+            return url in self._fetched
+
+    def _read_ref(self, ref_path):
+        """Return the blob a URL reference points to, if both still exist"""
+        if not os.path.exists(ref_path):
+            return None
+        with open(ref_path, encoding="utf-8") as f:
+            blob_path = os.path.join(self.root, f.read().strip())
+        return blob_path if os.path.exists(blob_path) else None
+
+    def _download(self, url, url_key, referer, log):
+        """Stream url into a partial file, resuming if possible, then move it into place"""
+        partial_path = os.path.join(self.root, "partial", url_key + ".part")
+        offset = os.path.getsize(partial_path) if os.path.exists(partial_path) else 0
+
+        headers = dict(self.headers)
+        if referer:
+            headers['Referer'] = referer
+        if offset:
+            headers['Range'] = f"bytes={offset}-"
+
+        with requests.get(url, headers=headers, timeout=self.timeout, stream=True) as response:
+            if response.status_code == 416:
+                # Stored partial no longer matches the remote file; start over
+                os.remove(partial_path)
+                return self._download(url, url_key, referer, log)
+            response.raise_for_status()
+
+            hasher = hashlib.sha256()
+            if offset and response.status_code == 206:
+                log(f"⏯️ Resuming image download at byte {offset}")
+                self._count("resumed")
+                with open(partial_path, 'rb') as f:
+                    for chunk in iter(lambda: f.read(self.chunk_size), b""):
+                        hasher.update(chunk)
+                mode = 'ab'
+            else:
+                mode = 'wb'
+
+            with open(partial_path, mode) as f:
+                for chunk in response.iter_content(chunk_size=self.chunk_size):
+                    f.write(chunk)
+                    hasher.update(chunk)
+
+            ext = image_extension(url, response.headers.get('content-type', ''))
+
+        digest = hasher.hexdigest()
+        blob_dir = os.path.join(self.root, "blobs", digest[:2])
+        os.makedirs(blob_dir, exist_ok=True)
+        blob_path = os.path.join(blob_dir, digest + ext)
+        if os.path.exists(blob_path):
+            # Same bytes already stored under another URL
+            os.remove(partial_path)
+            self._count("reused")
+        else:
+            os.replace(partial_path, blob_path)
+            self._count("downloaded")
+        return blob_path
+
+    def bytes_saved(self, default_url, blob_path, referer=None):
+        """Bytes the stored blob saves against default_url (HEAD Content-Length), or None if unknown
+
+        A negative result means the rendition is larger than the default; it is
+        counted separately instead of reducing the bytes saved.
+        """
+        headers = dict(self.headers)
+        if referer:
+            headers['Referer'] = referer
+        try:
+            response = requests.head(default_url, headers=headers, timeout=self.timeout, allow_redirects=True)
+        except requests.exceptions.RequestException:
+            return None
+        length = response.headers.get('Content-Length')
+        if not response.ok or not length or not length.isdigit():
+            return None
+        saved = int(length) - os.path.getsize(blob_path)
+        if saved >= 0:
+            self._count("bytes_saved", saved)
+        else:
+            self._count("bytes_larger", -saved)
+        return saved
+
+    def link(self, blob_path, dest_path):
+        """Atomically make dest_path refer to the stored blob"""
+        tmp_path = dest_path + ".tmp"
+        if os.path.lexists(tmp_path):
+            os.remove(tmp_path)
+        try:
+            os.link(blob_path, tmp_path)
+        except OSError:
+            try:
+                os.symlink(os.path.abspath(blob_path), tmp_path)
+            except OSError:
+                shutil.copyfile(blob_path, tmp_path)
+        os.replace(tmp_path, dest_path)
+
+    def report(self):
+        """Print how many images were downloaded and how many were reused"""
+        print(f"\n🖼️ Images downloaded: {self.stats['downloaded']}")
+        print(f"   Reused from store: {self.stats['reused']}")
+        print(f"   Resumed downloads: {self.stats['resumed']}")
+        print(f"   Saved by rendition selection: {self.stats['bytes_saved'] / 1024:.0f} KB")
+        if self.stats["bytes_larger"]:
+            print(f"   Renditions larger than the default src: {self.stats['bytes_larger'] / 1024:.0f} KB")
+
+
+def _atomic_write(path, text):
+    """Write a small text file via temp file plus rename"""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+"""
+Inverted Index
+==============
+Incremental word index over every stored article: Spanish and English titles
+and content. Each (article, field) is one document; postings keep the
+term frequency and delta-encoded word positions, so terms and phrases can be
+looked up, and a per-day term table answers top-N and threshold queries over
+any time window without scanning postings. Re-indexing an article only
+touches that article's rows, and unchanged text is skipped.
+
+Usage:
+    python inverted_index.py build
+    python inverted_index.py top --field title_en --days 7
+    python inverted_index.py repeated --field title_en --threshold 2 --days 1
+    python inverted_index.py search "gobierno de España"
+"""
+
+import argparse
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from word_stats import tokenize
+
+FIELDS = ["title_es", "title_en", "content_es", "content_en"]
+
+
+def _day(timestamp):
+    return datetime.fromtimestamp(timestamp, timezone.utc).strftime("%Y-%m-%d")
+
+
+def encode_positions(positions):
+    """Varint-encode the gaps between ascending word positions"""
+    out = bytearray()
+    previous = 0
+    for position in positions:
+        gap = position - previous
+        previous = position
+        while gap >= 0x80:
+            out.append((gap & 0x7F) | 0x80)
+            gap >>= 7
+        out.append(gap)
+    return bytes(out)
+
+
+def decode_positions(blob):
+    positions = []
+    value = shift = previous = 0
+    for byte in blob:
+        value |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+            continue
+        previous += value
+        positions.append(previous)
+        value = shift = 0
+    return positions
+
+
+class InvertedIndex:
+    """SQLite inverted index with positional postings and daily term counts"""
+
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS docs ("
+            " id INTEGER PRIMARY KEY, url TEXT NOT NULL, field TEXT NOT NULL, day TEXT NOT NULL,"
+            " length INTEGER NOT NULL, digest TEXT NOT NULL, UNIQUE (url, field));"
+            "CREATE TABLE IF NOT EXISTS terms ("
+            " id INTEGER PRIMARY KEY, term TEXT NOT NULL UNIQUE,"
+            " df INTEGER NOT NULL DEFAULT 0, cf INTEGER NOT NULL DEFAULT 0);"
+            "CREATE TABLE IF NOT EXISTS postings ("
+            " term_id INTEGER NOT NULL, doc_id INTEGER NOT NULL, tf INTEGER NOT NULL, positions BLOB NOT NULL,"
+            " PRIMARY KEY (term_id, doc_id)) WITHOUT ROWID;"
+            "CREATE INDEX IF NOT EXISTS postings_doc ON postings (doc_id);"
+            "CREATE TABLE IF NOT EXISTS daily_terms ("
+            " field TEXT NOT NULL, day TEXT NOT NULL, term_id INTEGER NOT NULL,"
+            " count INTEGER NOT NULL, docs INTEGER NOT NULL,"
+            " PRIMARY KEY (field, day, term_id)) WITHOUT ROWID;"
+        )
+        self._conn.commit()
+
+    def add_many(self, documents):
+        """Index (url, field, text, timestamp) documents in one transaction; return how many changed"""
+        changed = 0
+        with self._lock, self._conn:
+            for url, field, text, timestamp in documents:
+                text = text or ""
+                digest = hashlib.sha1(text.encode("utf-8")).hexdigest()
+                row = self._conn.execute(
+                    "SELECT id, digest FROM docs WHERE url = ? AND field = ?", (url, field)
+                ).fetchone()
+                if row and row[1] == digest:
+                    continue
+                if row:
+                    self._remove(row[0])
+                self._add(url, field, text, digest, _day(timestamp))
+                changed += 1
+        return changed
+
+    def add_articles(self, articles):
+        """Index the title and content fields of ArticleStore rows, skipping near-duplicates"""
+        return self.add_many(
+            (article["url"], field, article[field], article["fetched_at"] or article["listed_at"] or time.time())
+            for article in articles if not article.get("duplicate_of") for field in FIELDS if article.get(field)
+        )
+
+    def _add(self, url, field, text, digest, day):
+        tokens = tokenize(text)
+        doc_id = self._conn.execute(
+            "INSERT INTO docs (url, field, day, length, digest) VALUES (?, ?, ?, ?, ?)",
+            (url, field, day, len(tokens), digest)
+        ).lastrowid
+
+        positions = {}
+        for position, token in enumerate(tokens):
+            positions.setdefault(token, []).append(position)
+        if not positions:
+            return
+        self._conn.executemany("INSERT OR IGNORE INTO terms (term) VALUES (?)", [(term,) for term in positions])
+        term_ids = self._term_ids(list(positions))
+
+        self._conn.executemany(
+            "INSERT INTO postings (term_id, doc_id, tf, positions) VALUES (?, ?, ?, ?)",
+            [(term_ids[term], doc_id, len(found), encode_positions(found)) for term, found in positions.items()]
+        )
+        self._conn.executemany("UPDATE terms SET df = df + 1, cf = cf + ? WHERE id = ?",
+                               [(len(found), term_ids[term]) for term, found in positions.items()])
+        self._conn.executemany(
+            "INSERT INTO daily_terms (field, day, term_id, count, docs) VALUES (?, ?, ?, ?, 1)"
+            " ON CONFLICT(field, day, term_id) DO UPDATE SET count = count + excluded.count, docs = docs + 1",
+            [(field, day, term_ids[term], len(found)) for term, found in positions.items()]
+        )
+
+    def _remove(self, doc_id):
+        """Take a document's postings back out of the term and daily counts"""
+        field, day = self._conn.execute("SELECT field, day FROM docs WHERE id = ?", (doc_id,)).fetchone()
+        rows = self._conn.execute("SELECT term_id, tf FROM postings WHERE doc_id = ?", (doc_id,)).fetchall()
+        self._conn.executemany("UPDATE terms SET df = df - 1, cf = cf - ? WHERE id = ?",
+                               [(tf, term_id) for term_id, tf in rows])
+        self._conn.executemany(
+            "UPDATE daily_terms SET count = count - ?, docs = docs - 1 WHERE field = ? AND day = ? AND term_id = ?",
+            [(tf, field, day, term_id) for term_id, tf in rows]
+        )
+        self._conn.execute("DELETE FROM daily_terms WHERE field = ? AND day = ? AND docs <= 0", (field, day))
+        self._conn.execute("DELETE FROM postings WHERE doc_id = ?", (doc_id,))
+        self._conn.execute("DELETE FROM docs WHERE id = ?", (doc_id,))
+
+    def _term_ids(self, terms):
+        """Map terms to their ids, querying in chunks below SQLite's parameter limit"""
+        ids = {}
+        for start in range(0, len(terms), 500):
+            chunk = terms[start:start + 500]
+            ids.update(self._conn.execute(
+                f"SELECT term, id FROM terms WHERE term IN ({', '.join('?' for _ in chunk)})", chunk
+            ).fetchall())
+        return ids
+
+    def _window(self, field, since, until):
+        clauses, params = ["d.field = ?"], [field]
+        if since is not None:
+            clauses.append("d.day >= ?")
+            params.append(_day(since))
+        if until is not None:
+            clauses.append("d.day <= ?")
+            params.append(_day(until))
+        return " AND ".join(clauses), params
+
+    def top_terms(self, n=10, field="title_en", since=None, until=None):
+        """The n most frequent (term, count) pairs of a field, in whole UTC days between two timestamps"""
+        where, params = self._window(field, since, until)
+        with self._lock:
+            return self._conn.execute(
+                f"SELECT t.term, SUM(d.count) AS total FROM daily_terms d JOIN terms t ON t.id = d.term_id"
+                f" WHERE {where} GROUP BY d.term_id ORDER BY total DESC, t.term LIMIT ?", params + [n]
+            ).fetchall()
+
+    def repeated_terms(self, threshold=2, field="title_en", since=None, until=None):
+        """(term, count) pairs appearing more than threshold times in the window, most frequent first"""
+        where, params = self._window(field, since, until)
+        with self._lock:
+            return self._conn.execute(
+                f"SELECT t.term, SUM(d.count) AS total FROM daily_terms d JOIN terms t ON t.id = d.term_id"
+                f" WHERE {where} GROUP BY d.term_id HAVING total > ? ORDER BY total DESC, t.term",
+                params + [threshold]
+            ).fetchall()
+
+    def term_stats(self, term):
+        """(document frequency, collection frequency) of a term"""
+        with self._lock:
+            row = self._conn.execute("SELECT df, cf FROM terms WHERE term = ?", (term.lower(),)).fetchone()
+        return tuple(row) if row else (0, 0)
+
+    def lookup(self, term, field=None, limit=20):
+        """(url, field, term frequency) of the documents containing term, most occurrences first"""
+        sql = ("SELECT d.url, d.field, p.tf FROM terms t JOIN postings p ON p.term_id = t.id"
+               " JOIN docs d ON d.id = p.doc_id WHERE t.term = ?")
+        params = [term.lower()]
+        if field:
+            sql += " AND d.field = ?"
+            params.append(field)
+        with self._lock:
+            return self._conn.execute(sql + " ORDER BY p.tf DESC, d.url LIMIT ?", params + [limit]).fetchall()
+
+    def phrase(self, text, field=None, limit=20):
+        """(url, field, occurrences) of the documents containing the words of text in order"""
+        words = tokenize(text)
+        if not words:
+            return []
+        distinct = list(set(words))
+        with self._lock:
+            term_rows = {term: (term_id, df) for term, term_id, df in self._conn.execute(
+                f"SELECT term, id, df FROM terms WHERE term IN ({', '.join('?' for _ in distinct)})", distinct
+            )}
+            if len(term_rows) < len(distinct):
+                return []
+
+            # Intersect the posting lists starting from the rarest term
+            postings = {}
+            candidates = None
+            for word in sorted(distinct, key=lambda word: term_rows[word][1]):
+                sql = "SELECT p.doc_id, p.positions FROM postings p"
+                params = [term_rows[word][0]]
+                if field:
+                    sql += " JOIN docs d ON d.id = p.doc_id WHERE p.term_id = ? AND d.field = ?"
+                    params.append(field)
+                else:
+                    sql += " WHERE p.term_id = ?"
+                rows = {doc_id: blob for doc_id, blob in self._conn.execute(sql, params)
+                        if candidates is None or doc_id in candidates}
+                candidates = set(rows)
+                postings[word] = rows
+                if not candidates:
+                    return []
+
+            matches = []
+            for doc_id in candidates:
+                starts = set(decode_positions(postings[words[0]][doc_id]))
+                for offset, word in enumerate(words[1:], start=1):
+                    starts &= {position - offset for position in decode_positions(postings[word][doc_id])}
+                if starts:
+                    matches.append((doc_id, len(starts)))
+            matches.sort(key=lambda match: -match[1])
+
+            results = []
+            for doc_id, occurrences in matches[:limit]:
+                url, doc_field = self._conn.execute("SELECT url, field FROM docs WHERE id = ?", (doc_id,)).fetchone()
+                results.append((url, doc_field, occurrences))
+        return results
+
+    def stats(self):
+        """Document and term counts of the index"""
+        with self._lock:
+            docs = self._conn.execute("SELECT COUNT(*) FROM docs").fetchone()[0]
+            terms = self._conn.execute("SELECT COUNT(*) FROM terms WHERE df > 0").fetchone()[0]
+        return {"documents": docs, "terms": terms}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def main():
+    from article_store import ArticleStore
+    from scraper_config import SCRAPER_CONFIG
+
+    parser = argparse.ArgumentParser(description="Build and query the article word index")
+    parser.add_argument("command", choices=["build", "top", "repeated", "search"])
+    parser.add_argument("text", nargs="?", help="Word or phrase to search for")
+    parser.add_argument("--index", default=SCRAPER_CONFIG["search_index"])
+    parser.add_argument("--store", default=SCRAPER_CONFIG["article_store"])
+    parser.add_argument("--field", choices=FIELDS, help="Field to query (top/repeated default: title_en)")
+    parser.add_argument("--days", type=float, help="Only the last N days (default: all)")
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--threshold", type=int, default=2)
+    args = parser.parse_args()
+
+    index = InvertedIndex(args.index)
+    since = None
+    if args.days is not None:
+        since = (datetime.now(timezone.utc) - timedelta(days=args.days)).timestamp()
+
+    if args.command == "build":
+        store = ArticleStore(args.store)
+        changed = index.add_articles(store.iter_articles())
+        store.close()
+        stats = index.stats()
+        print(f"✅ {changed} documents (re)indexed; {stats['documents']} documents, {stats['terms']} terms")
+    elif args.command in ("top", "repeated"):
+        field = args.field or "title_en"
+        if args.command == "top":
+            rows = index.top_terms(args.top, field, since)
+        else:
+            rows = index.repeated_terms(args.threshold, field, since)
+        for term, count in rows:
+            print(f"   '{term}' appears {count} times")
+        if not rows:
+            print("📝 No matching words")
+    else:
+        if not args.text:
+            parser.error("search needs a word or phrase")
+        started = time.perf_counter()
+        if len(tokenize(args.text)) > 1:
+            rows = index.phrase(args.text, args.field, args.top)
+        else:
+            rows = index.lookup(args.text, args.field, args.top)
+        elapsed = (time.perf_counter() - started) * 1000
+        for url, field, count in rows:
+            print(f"   {count}× {field:<10} {url}")
+        print(f"🔎 {len(rows)} documents in {elapsed:.1f} ms")
+    index.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,213 +1,479 @@
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from bs4 import BeautifulSoup
-from webdriver_manager.chrome import ChromeDriverManager
-from deep_translator import GoogleTranslator
 import requests
 import os
-import re
 import time
-from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 
-# Setup Selenium
-service = Service(ChromeDriverManager().install())
-driver = webdriver.Chrome(service=service)
+from extractors import (
+    LISTING_SELECTOR, CONTENT_SELECTOR, IMAGE_SELECTORS, LISTING_SCOPE, ARTICLE_SCOPE,
+    parse_listing, extract_content, find_cover_rendition
+)
+from article_store import ArticleStore
+from crawl_frontier import CrawlFrontier, crawl
+from readiness import ReadinessPredicate
+from fetcher import PageFetcher
+from http_cache import HttpCache
+from image_store import ImageStore
+from inverted_index import InvertedIndex
+from near_duplicates import NearDuplicateIndex
+from parse_pool import ParsePool, parse_article
+from rate_limit import HostRateLimiter
+from scraper_config import CRAWL_CONFIG, FAST_LOAD_CONFIG, SCRAPER_CONFIG
+from selector_plan import SelectorPlan, plan_key
+from tracing import tracer
+from translation import BatchTranslator, BodyTranslator, TranslationCache
+from word_stats import count_words, repeated_words
 
-# Go to El País - Opinion Section
-driver.get('https://elpais.com/opinion/')
-time.sleep(3)
+# What each page type must contain before it is parsed
+LISTING_READY = ReadinessPredicate(
+    "listing", LISTING_SELECTOR, min_count=SCRAPER_CONFIG["max_articles"],
+    timeout=SCRAPER_CONFIG["readiness_timeouts"]["listing"]
+)
+ARTICLE_READY = ReadinessPredicate(
+    "article", CONTENT_SELECTOR, timeout=SCRAPER_CONFIG["readiness_timeouts"]["article"]
+)
 
-# Extract and parse the HTML
-soup = BeautifulSoup(driver.page_source, 'html.parser')
-articles = soup.select('article')[:5]
 
-# Prepare main output folder
-base_dir = "articles_data"
-os.makedirs(base_dir, exist_ok=True)
+def save_cover_image(img_url, article_url, image_store, log=print, default_url=None):
+    """Store the article cover image and return its blob path"""
+    try:
+        if img_url:
+            log(f"🖼️ Attempting to download image from: {img_url}")
 
-# Track all titles
-original_titles = []
-translated_titles = []
+            blob_path = image_store.fetch(img_url, referer=article_url, log=log)
 
-print("\n📄 Scraping Articles...\n")
+            log(f"✅ Image saved successfully: {blob_path}")
+            # Only measured for renditions downloaded now, not for blobs reused from the store
+            if default_url and default_url != img_url and image_store.downloaded(img_url):
+                saved = image_store.bytes_saved(default_url, blob_path, referer=article_url)
+                if saved is not None and saved >= 0:
+                    log(f"📉 Rendition is {saved / 1024:.0f} KB smaller than the default src")
+                elif saved is not None:
+                    log(f"📈 Rendition is {-saved / 1024:.0f} KB larger than the default src")
+            return blob_path
 
-for idx, article in enumerate(articles, start=1):
-    # Extract title
-    title_tag = article.find('h1') or article.find('h2')
-    if not title_tag:
-        continue
+        else:
+            log("⚠️ No suitable image found for this article")
 
-    title = title_tag.get_text().strip()
-    original_titles.append(title)
-    print(f"📌 Article {idx} Title (Spanish): {title}")
+    except requests.exceptions.RequestException as e:
+        log(f"❌ Network error downloading image: {e}")
+    except Exception as e:
+        log(f"❌ Error saving image: {e}")
+    return None
 
-    # Make a folder for each article
-    article_dir = os.path.join(base_dir, f"article_{idx}")
-    os.makedirs(article_dir, exist_ok=True)
 
-    # Save title to a text file
-    with open(os.path.join(article_dir, "title_es.txt"), "w", encoding="utf-8") as f:
-        f.write(title)
+def fetch_article(entry, fetcher, store, plan=None):
+    """Stage 1: fetch one listing entry and extract it, or queue its HTML on the parse pool
 
-    # Get article URL
-    link_tag = article.find('a')
-    if not link_tag or not link_tag.get('href'):
-        continue
+    Returns the article state for finish_article; only compact extracted data
+    (or a PendingRecord) is kept, never a soup tree.
+    """
+    with tracer.span("article", idx=entry["idx"]):
+        return _fetch_article(entry, fetcher, store, plan)
 
-    article_url = link_tag['href']
-    if not article_url.startswith("http"):
-        article_url = "https://elpais.com" + article_url
 
-    try:
-        driver.get(article_url)
-        time.sleep(3)
-        article_page = BeautifulSoup(driver.page_source, 'html.parser')
+def _fetch_article(entry, fetcher, store, plan):
+    lines = []
+    log = lines.append
+    state = {"lines": lines, "record": None, "finished": True, "pending": None, "ok": False}
+
+    idx, title = entry["idx"], entry["title"]
+    log(f"📌 Article {idx} Title (Spanish): {title}")
+
+    article_url = entry["url"]
+    if not article_url:
+        log("⚠️ No link found for this article, nothing to store")
+        return state
 
-        # Extract content
-        content_paragraphs = article_page.select(
-            'div.a_c div.a_m-p > p, div.a_c article > p, div#fusion-app p, p.c_d'
+    record = state["record"] = {"url": article_url, "position": idx, "title_es": title}
+    extract = None
+    if fetcher.parse_pool is not None:
+        # Parsed on a worker process, with the content and image selectors learned so far
+        key = plan_key(article_url)
+        extract = partial(
+            parse_article, base_url=SCRAPER_CONFIG["base_url"], backend=SCRAPER_CONFIG["parser_backend"],
+            content_selector=plan.leader(article_url, "content") if plan else None,
+            image_selectors=plan.ranked(key, "image", IMAGE_SELECTORS) if plan else None,
+            target_width=SCRAPER_CONFIG["image_target_width"], formats=SCRAPER_CONFIG["image_formats"]
         )
-        content = "\n".join(p.get_text().strip() for p in content_paragraphs if p.get_text().strip())
+    result = None
+    try:
+        result = fetcher.fetch(article_url, ARTICLE_READY, log=log, scope=ARTICLE_SCOPE, extract=extract)
+    except Exception as e:
+        log(f"❌ Error fetching content: {e}")
 
-        if content:
-            print(f"📝 Content Snippet:\n{content[:300]}...\n")
-        else:
-            print("⚠️ No content found.\n")
+    # A 304 on an article already in the store needs no work at all
+    cached = result.parsed if result else None
+    stored = store.get(article_url) if cached else None
+    if stored and stored["title_es"] == title and stored["duplicate_of"]:
+        log(f"♻️ Article not modified since last run, still a near-duplicate of {stored['duplicate_of']}")
+        record["duplicate_of"] = stored["duplicate_of"]
+        state["ok"] = True
+        return state
+    if (stored and stored["title_es"] == title and stored["content_es"] is not None
+            and (stored["image_blob"] is None or os.path.exists(stored["image_blob"]))):
+        log("♻️ Article not modified since last run, keeping stored copy")
+        state["ok"] = True
+        return state
 
-        # Save content to file
-        with open(os.path.join(article_dir, "content_es.txt"), "w", encoding="utf-8") as f:
-            f.write(content)
+    if result is None:
+        return state
 
-    except Exception as e:
-        print(f"❌ Error fetching content: {e}")
+    state["finished"] = False
+    if cached:
+        state.update(content=cached["content"], img_url=cached["image_url"], default_url=None)
+    elif result.record is not None:
+        state["pending"] = result.record
+    else:
+        with tracer.span("extract"):
+            content = extract_content(result.page, plan, article_url)
+            img_url, default_url = find_cover_rendition(
+                result.page, SCRAPER_CONFIG["base_url"], SCRAPER_CONFIG["image_target_width"],
+                SCRAPER_CONFIG["image_formats"], plan, article_url
+            )
+        state.update(content=content, img_url=img_url, default_url=default_url)
+    return state
+
+
+def finish_article(fetched, fetcher, image_store, plan=None, duplicates=None, order=None):
+    """Stage 2: collect the extraction of a fetch_article future, then save the cover
 
-    # Download cover image if available
+    Returns (log lines, record, ok); ok is False when no content could be
+    extracted, so the article is retried instead of counted as done. order is
+    the article's position in the listing, so near-duplicates are registered
+    in listing order.
+    """
+    state = None
     try:
-        # Try multiple selectors for images in El País articles
-        img_selectors = [
-            'figure.a_m-media img',  
-            'div.a_m-media img',     
-            'img.a_m-media__img',    
-            'figure img',            
-            'div.c_m img',           
-            'img[src*="elpais"]'     
-        ]
-        
-        img_tag = None
-        for selector in img_selectors:
-            img_tag = article_page.select_one(selector)
-            if img_tag and img_tag.get("src"):
-                break
-        
-        if img_tag and img_tag.get("src"):
-            img_url = img_tag["src"]
-            
-            # Handle relative URLs
-            if img_url.startswith("//"):
-                img_url = "https:" + img_url
-            elif img_url.startswith("/"):
-                img_url = "https://elpais.com" + img_url
-            
-            # Add headers to mimic a real browser request
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-                'Referer': article_url,
-                'Accept': 'image/webp,image/apng,image/*,*/*;q=0.8'
-            }
-            
-            print(f"🖼️ Attempting to download image from: {img_url}")
-            
-            img_response = requests.get(img_url, headers=headers, timeout=15)
-            img_response.raise_for_status()  
-            
-            
-            if img_url.lower().endswith(('.jpg', '.jpeg')):
-                ext = '.jpg'
-            elif img_url.lower().endswith('.png'):
-                ext = '.png'
-            elif img_url.lower().endswith('.webp'):
-                ext = '.webp'
-            else:
-               
-                content_type = img_response.headers.get('content-type', '')
-                if 'jpeg' in content_type or 'jpg' in content_type:
-                    ext = '.jpg'
-                elif 'png' in content_type:
-                    ext = '.png'
-                elif 'webp' in content_type:
-                    ext = '.webp'
-                else:
-                    ext = '.jpg'  # Default fallback
-            
-            image_path = os.path.join(article_dir, f"cover{ext}")
-            
-            with open(image_path, 'wb') as f:
-                f.write(img_response.content)
-            
-            print(f"✅ Image saved successfully: {image_path}")
-            
-        else:
-            print("⚠️ No suitable image found for this article")
-            
-    except requests.exceptions.RequestException as e:
-        print(f"❌ Network error downloading image: {e}")
-    except Exception as e:
-        print(f"❌ Error saving image: {e}")
-    
-    print("─" * 50)  # Separator between articles
+        state = fetched.result()
+        if state["finished"]:
+            return state["lines"], state["record"], state["ok"]
+        with tracer.span("article_finish", idx=state["record"]["position"]):
+            return _finish_article(state, fetcher, image_store, plan, duplicates, order)
+    finally:
+        # Unchanged or failed articles are not remembered; their validators must not pile up
+        if state is not None and state["record"] is not None:
+            fetcher.release(state["record"]["url"])
+        # Articles that were never fingerprinted must not hold back later ones
+        if duplicates is not None and order is not None:
+            duplicates.skip(order)
 
-# Hold browser open until user presses Enter
-input("\n✅ Done scraping. Press Enter to close the browser...")
-driver.quit()
 
-# Save all Spanish titles
-with open(os.path.join(base_dir, "original_titles.txt"), "w", encoding="utf-8") as f:
-    for title in original_titles:
-        f.write(title + "\n")
+def _finish_article(state, fetcher, image_store, plan, duplicates, order):
+    log = state["lines"].append
+    record = state["record"]
+    article_url, title = record["url"], record["title_es"]
 
-# Translate titles
-print("\n🌐 Translating Titles...\n")
+    if state["pending"] is not None:
+        try:
+            extracted = state["pending"].result(log=log)
+        except Exception as e:
+            log(f"❌ Error fetching content: {e}")
+            return state["lines"], record, False
+        content = "\n".join(extracted["paragraphs"])
+        img_url, default_url = extracted["image_url"], extracted["default_image_url"]
+        if plan is not None:
+            plan.record(article_url, "content", extracted["content_selector"], extracted["content_first"])
+            plan.record(article_url, "image", extracted["image_selector"], extracted["image_first"])
+    else:
+        content, img_url, default_url = state["content"], state["img_url"], state["default_url"]
+
+    if content:
+        log(f"📝 Content Snippet:\n{content[:300]}...\n")
+    else:
+        log("⚠️ No content found.\n")
+
+    fetcher.remember(article_url, {
+        "title": title,
+        "content": content,
+        "image_url": img_url
+    })
+
+    # A republished copy is only linked to the article it duplicates
+    if duplicates is not None:
+        with tracer.span("fingerprint"):
+            duplicate = duplicates.check(article_url, content, order=order)
+        if duplicate:
+            canonical, similar = duplicate
+            log(f"🪞 Near-duplicate ({similar:.0%} similar) of {canonical}, not stored or translated again")
+            record["duplicate_of"] = canonical
+            return state["lines"], record, True
+
+    with tracer.span("cover_image"):
+        image_blob = save_cover_image(img_url, article_url, image_store, log=log, default_url=default_url)
+
+    record.update({
+        "content_es": content,
+        "image_url": img_url,
+        "image_blob": image_blob,
+        "fetched_at": time.time()
+    })
+    return state["lines"], record, bool(content)
+
+
+def translate_titles(entries, store, translator):
+    """Translate the listing titles and store each translation with its article"""
+    translations = translator.translate_many([entry["title"] for entry in entries])
+
+    translated_titles = []
+    stored = []
+    for entry in entries:
+        translated = translations.get(entry["title"])
+        if translated is None:
+            print(f"❌ Error translating title {entry['idx']}")
+            continue
 
-for idx, title in enumerate(original_titles, start=1):
-    try:
-        translated = GoogleTranslator(source='es', target='en').translate(title)
         translated_titles.append(translated)
-        print(f"📝 Title {idx} Translated: {translated}")
+        print(f"📝 Title {entry['idx']} Translated: {translated}")
+        if entry["url"]:
+            stored.append((entry["url"], translated))
 
-        # Save translated title to corresponding article folder
-        article_dir = os.path.join(base_dir, f"article_{idx}")
-        with open(os.path.join(article_dir, "title_en.txt"), "w", encoding="utf-8") as f:
-            f.write(translated)
-    except Exception as e:
-        print(f"❌ Error translating title {idx}: {e}")
+    # One transaction for every translation
+    store.put_translations(stored)
+    return translated_titles
 
-# Save all translated titles
-with open(os.path.join(base_dir, "translated_titles.txt"), "w", encoding="utf-8") as f:
-    for title in translated_titles:
-        f.write(title + "\n")
 
-# Repeated word analysis
-print("\n🔎 Analyzing Repeated Words...\n")
-all_words = []
+def translate_bodies(entries, store, translator):
+    """Translate the stored bodies that have no English version yet and store the translations"""
+    articles = [store.get(entry["url"]) for entry in entries if entry["url"]]
+    pending = [article for article in articles if article and article["content_es"] and article["content_en"] is None]
+    translations = translator.translate_many([article["content_es"] for article in pending])
+
+    stored = []
+    for article in pending:
+        translated = translations.get(article["content_es"])
+        if translated is None:
+            print(f"❌ Error translating body of article {article['position']}")
+            continue
+        print(f"📝 Body {article['position']} Translated: {len(translated)} characters")
+        stored.append((article["url"], translated))
+
+    # One transaction for every translation
+    store.put_content_translations(stored)
+    return len(stored)
+
+
+def analyze_words(translated_titles, original_titles):
+    """Print words repeated across the translated titles"""
+    print("\n🔎 Analyzing Repeated Words...\n")
+    word_counts = count_words(translated_titles)
+
+    # Show words that appear more than two
+    repeated = repeated_words(word_counts, threshold=2)
+
+    if repeated:
+        print("🔁 Words appearing more than once:")
+        for word, count in repeated:
+            print(f"   '{word}' appears {count} times")
+    else:
+        print("📝 No repeated words found in titles")
+
+    print(f"\n📊 Total words analyzed: {sum(word_counts.values())}")
+    print(f"📊 Unique words: {len(word_counts)}")
+    print(f"📊 Articles processed: {len(original_titles)}")
+
+
+def store_batch(store, records, listed_at, frontier=None, failed=()):
+    """Write scraped articles in one transaction and update them in the crawl frontier
+
+    Articles whose content was extracted are marked done; the failed URLs are
+    left queued for another attempt, up to CRAWL_CONFIG["max_attempts"].
+    """
+    if not records:
+        return
+    with tracer.span("store_articles"):
+        store.put_many(records, listed_at=listed_at)
+    if frontier:
+        failed = set(failed)
+        frontier.mark_many([record["url"] for record in records if record["url"] not in failed], "done")
+        frontier.retry_many(failed, CRAWL_CONFIG["max_attempts"])
+
+
+def load_listing(fetcher):
+    """Return the listing entries, reusing the cached ones when the page is unchanged"""
+    listing_url = SCRAPER_CONFIG["listing_url"]
+    max_articles = SCRAPER_CONFIG["max_articles"]
+
+    result = fetcher.fetch(listing_url, LISTING_READY, scope=LISTING_SCOPE)
+    if result.parsed is not None:
+        if result.parsed["max_articles"] == max_articles:
+            print("♻️ Opinion listing not modified since last run")
+            fetcher.release(listing_url)
+            return result.parsed["entries"]
+        # Cached entries were cut at a different limit
+        result = fetcher.fetch(listing_url, LISTING_READY, revalidate=False, scope=LISTING_SCOPE)
+
+    entries = parse_listing(result.page, SCRAPER_CONFIG["base_url"], max_articles)
+    fetcher.remember(listing_url, {"max_articles": max_articles, "entries": entries})
+    return entries
+
+
+def main():
+    http_cache = HttpCache(os.path.join(SCRAPER_CONFIG["cache_dir"], "http_cache.sqlite"))
+    # Article parsing on worker processes, fed by the fetching threads
+    parse_pool = None
+    if SCRAPER_CONFIG["parse_workers"] > 0:
+        parse_pool = ParsePool(SCRAPER_CONFIG["parse_workers"], SCRAPER_CONFIG["parse_max_in_flight"])
+    fetcher = PageFetcher(
+        headers=SCRAPER_CONFIG["headers"],
+        timeout=SCRAPER_CONFIG["request_timeout"],
+        max_browsers=SCRAPER_CONFIG["concurrency"],
+        http_cache=http_cache,
+        parser_backend=SCRAPER_CONFIG["parser_backend"],
+        fast_load=FAST_LOAD_CONFIG if FAST_LOAD_CONFIG["enabled"] else None,
+        rate_limiter=HostRateLimiter(SCRAPER_CONFIG["per_host_rate"], SCRAPER_CONFIG["per_host_burst"]),
+        parse_pool=parse_pool
+    )
+    # Add headers to mimic a real browser request
+    image_store = ImageStore(
+        SCRAPER_CONFIG["image_store_dir"],
+        headers={
+            'User-Agent': SCRAPER_CONFIG["headers"]["User-Agent"],
+            'Accept': 'image/webp,image/apng,image/*,*/*;q=0.8'
+        },
+        timeout=SCRAPER_CONFIG["request_timeout"]
+    )
+    # Article fingerprints, to link republished copies to the first one seen
+    duplicates = NearDuplicateIndex(
+        os.path.join(SCRAPER_CONFIG["cache_dir"], "fingerprints.sqlite"),
+        threshold=SCRAPER_CONFIG["near_duplicate_threshold"],
+        bands=SCRAPER_CONFIG["near_duplicate_bands"],
+        min_words=SCRAPER_CONFIG["near_duplicate_min_words"]
+    )
+    # Selector order learned on previous runs, per site section
+    plan = SelectorPlan(
+        os.path.join(SCRAPER_CONFIG["cache_dir"], "selector_plan.json"),
+        window=SCRAPER_CONFIG["selector_plan_window"],
+        min_hit_rate=SCRAPER_CONFIG["selector_plan_min_hit_rate"]
+    )
+
+    # Go to El País - Opinion Section, or crawl every seed section in depth
+    frontier = None
+    if CRAWL_CONFIG["enabled"]:
+        frontier = CrawlFrontier(CRAWL_CONFIG["frontier_path"])
+        print("\n🕸️ Crawling sections...\n")
+        with tracer.span("crawl"):
+            entries = crawl(fetcher, frontier, CRAWL_CONFIG, SCRAPER_CONFIG["concurrency"],
+                            readiness_timeout=SCRAPER_CONFIG["readiness_timeouts"]["listing"])
+    else:
+        with tracer.span("listing"):
+            entries = load_listing(fetcher)
+
+    # Every article goes to one store, written in a single batch
+    store = ArticleStore(SCRAPER_CONFIG["article_store"])
+    listed_at = time.time()
+
+    print("\n📄 Scraping Articles...\n")
+
+    # Two stages: fetching threads load pages (handing the HTML to the parse pool
+    # when there is one) and move on; finishing threads collect each extraction
+    # and save the cover image. Output is still printed in listing order.
+    records = []
+    failed = []
+    duplicate_urls = set()
+    concurrency = SCRAPER_CONFIG["concurrency"]
+    with tracer.span("scrape_articles"), ThreadPoolExecutor(max_workers=concurrency) as fetchers, \
+            ThreadPoolExecutor(max_workers=concurrency) as finishers:
+        fetched = [fetchers.submit(fetch_article, entry, fetcher, store, plan) for entry in entries]
+        # Finishers start in listing order, so waiting on earlier positions cannot deadlock
+        finished = [finishers.submit(finish_article, future, fetcher, image_store, plan, duplicates, order)
+                    for order, future in enumerate(fetched)]
+        for future in finished:
+            lines, record, ok = future.result()
+            for line in lines:
+                print(line)
+            print("─" * 50)  # Separator between articles
+            if record:
+                records.append(record)
+                if not ok:
+                    failed.append(record["url"])
+                if record.get("duplicate_of"):
+                    duplicate_urls.add(record["url"])
+            if len(records) >= SCRAPER_CONFIG["store_batch_size"]:
+                store_batch(store, records, listed_at, frontier, failed)
+                records, failed = [], []
+    store_batch(store, records, listed_at, frontier, failed)
+    if frontier:
+        frontier.close()
+
+    fetcher.report()
+    fetcher.readiness.report()
+    if parse_pool:
+        parse_pool.report()
+        parse_pool.close()
+    image_store.report()
+    duplicates.report()
+    duplicates.close()
+    plan.report()
+    plan.save()
+
+    # Hold browser open until user presses Enter
+    if fetcher.browser_started:
+        input("\n✅ Done scraping. Press Enter to close the browser...")
+    fetcher.close()
+    http_cache.close()
+
+    original_titles = [entry["title"] for entry in entries]
+    # Near-duplicates are neither translated nor counted in the word statistics
+    unique_entries = [entry for entry in entries if entry["url"] not in duplicate_urls]
+
+    # Translate titles
+    print("\n🌐 Translating Titles...\n")
+    cache = TranslationCache(
+        os.path.join(SCRAPER_CONFIG["cache_dir"], "translations.sqlite"),
+        max_entries=SCRAPER_CONFIG["translation_cache_size"]
+    )
+    translator = BatchTranslator(
+        source='es', target='en', cache=cache, batch_chars=SCRAPER_CONFIG["translation_batch_chars"],
+        base_url=SCRAPER_CONFIG["translator_base_url"]
+    )
+    with tracer.span("translate"):
+        translated_titles = translate_titles(unique_entries, store, translator)
+    translator.report()
+
+    # Translate article bodies, chunk by chunk
+    if SCRAPER_CONFIG["translate_bodies"]:
+        print("\n🌐 Translating Article Bodies...\n")
+        body_translator = BodyTranslator(
+            source='es', target='en', cache=cache, chunk_chars=SCRAPER_CONFIG["body_chunk_chars"],
+            concurrency=SCRAPER_CONFIG["body_translation_concurrency"], rate=SCRAPER_CONFIG["translator_rate"],
+            burst=SCRAPER_CONFIG["translator_burst"], retries=SCRAPER_CONFIG["translation_retries"],
+            base_url=SCRAPER_CONFIG["translator_base_url"]
+        )
+        with tracer.span("translate_bodies"):
+            translate_bodies(unique_entries, store, body_translator)
+        body_translator.report()
+    cache.close()
 
-for title in translated_titles:
-    words = re.findall(r'\b\w+\b', title.lower())
-    all_words.extend(words)
+    # Word index over every article ever stored, updated with this run's articles
+    index = InvertedIndex(SCRAPER_CONFIG["search_index"])
+    with tracer.span("index_articles"):
+        changed = index.add_articles(filter(None, (store.get(entry["url"]) for entry in unique_entries if entry["url"])))
+    index_stats = index.stats()
+    print(f"\n📚 Search index: {changed} documents updated "
+          f"({index_stats['documents']} documents, {index_stats['terms']} terms)")
 
-word_counts = Counter(all_words)
+    # Folder layout of the previous version, only when asked for
+    if SCRAPER_CONFIG["export_folders"]:
+        with tracer.span("export"):
+            count = store.export(SCRAPER_CONFIG["output_dir"])
+        print(f"\n📁 Exported {count} articles to {SCRAPER_CONFIG['output_dir']}")
+    print(f"\n🗄️ Articles stored in: {SCRAPER_CONFIG['article_store']}")
+    store.close()
 
-# Show words that appear more than two
-repeated_words = {word: count for word, count in word_counts.items() if count > 2}
+    # Repeated word analysis
+    with tracer.span("word_analysis"):
+        analyze_words(translated_titles, original_titles)
+        print("\n📈 Most frequent title words over the last 7 days:")
+        for word, count in index.top_terms(10, "title_en", since=time.time() - 7 * 24 * 3600):
+            print(f"   '{word}' appears {count} times")
+    index.close()
 
-if repeated_words:
-    print("🔁 Words appearing more than once:")
-    for word, count in sorted(repeated_words.items(), key=lambda x: x[1], reverse=True):
-        print(f"   '{word}' appears {count} times")
-else:
-    print("📝 No repeated words found in titles")
+    print(f"\n🧵 Trace saved to: {tracer.export('main')}")
+    if tracer.dropped:
+        print(f"   {tracer.dropped} spans beyond the first {tracer.max_spans} were not kept (TRACE_MAX_SPANS)")
+    print("\n🎉 Script completed successfully!")
 
-print(f"\n📊 Total words analyzed: {len(all_words)}")
-print(f"📊 Unique words: {len(word_counts)}")
-print(f"📊 Articles processed: {len(original_titles)}")
 
-print("\n🎉 Script completed successfully!")
+if __name__ == "__main__":
+    main()
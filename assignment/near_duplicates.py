@@ -0,0 +1,141 @@
+# Near-duplicate article detection
+# Every article body gets a 64-bit SimHash over its word shingles. The hash is
+# split into bands that are indexed in SQLite, so candidates are the articles
+# sharing at least one band value, and only those are compared bit by bit. Two
+# articles whose hashes differ in fewer bits than there are bands always
+# share a band. An article at least `threshold` similar to a canonical one is
+# linked to it instead of being stored, translated and counted again. Checks
+# from concurrent threads can pass their listing order, so the first copy in
+# the listing is always the canonical one, whichever page finished first.
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter
+
+from article_store import canonical_url
+from word_stats import tokenize
+
+BITS = 64
+
+
+def simhash(tokens, shingle_size=3):
+    """64-bit SimHash of the word shingles of a token list"""
+    shingles = Counter(
+        " ".join(tokens[start:start + shingle_size])
+        for start in range(max(1, len(tokens) - shingle_size + 1))
+    )
+    weights = [0] * BITS
+    for shingle, count in shingles.items():
+        value = int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big")
+        for bit in range(BITS):
+            weights[bit] += count if value >> bit & 1 else -count
+    return sum(1 << bit for bit in range(BITS) if weights[bit] > 0)
+
+
+def similarity(a, b):
+    """Share of equal bits between two fingerprints"""
+    return 1 - bin(a ^ b).count("1") / BITS
+
+
+def _signed(value):
+    # SQLite integers are signed 64-bit
+    return value - (1 << BITS) if value >= 1 << (BITS - 1) else value
+
+
+class NearDuplicateIndex:
+    """Banded SimHash index of article bodies, mapping near-duplicates to their canonical copy"""
+
+    def __init__(self, path, threshold=0.9, bands=8, min_words=50):
+        if BITS % bands:
+            raise ValueError(f"bands must divide {BITS}, got {bands}")
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.threshold = threshold
+        self.bands = bands
+        self.min_words = min_words
+        self.stats = {"checked": 0, "duplicates": 0}
+        self._band_bits = BITS // bands
+        self._lock = threading.Lock()
+        self._turns = threading.Condition()
+        self._next_order = 0
+        self._skipped = set()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS fingerprints ("
+            " url TEXT PRIMARY KEY, fingerprint INTEGER NOT NULL, duplicate_of TEXT, seen_at REAL NOT NULL);"
+            "CREATE TABLE IF NOT EXISTS bands ("
+            " band INTEGER NOT NULL, value INTEGER NOT NULL, url TEXT NOT NULL,"
+            " PRIMARY KEY (band, value, url)) WITHOUT ROWID;"
+        )
+        self._conn.commit()
+
+    def _band_values(self, fingerprint):
+        mask = (1 << self._band_bits) - 1
+        return [(band, fingerprint >> (band * self._band_bits) & mask) for band in range(self.bands)]
+
+    def skip(self, order):
+        """Let the checks after position order (0, 1, 2, ... in this run) go ahead; safe to call twice"""
+        with self._turns:
+            if order >= self._next_order:
+                self._skipped.add(order)
+            while self._next_order in self._skipped:
+                self._skipped.discard(self._next_order)
+                self._next_order += 1
+            self._turns.notify_all()
+
+    def check(self, url, text, order=None):
+        """Register an article body; return (canonical URL, similarity) if it is a near-duplicate, else None
+
+        Bodies shorter than min_words are not fingerprinted. With an order, the
+        article is registered only after every earlier position was checked or
+        skipped, and its own position is released afterwards.
+        """
+        try:
+            tokens = tokenize(text or "")
+            if len(tokens) < self.min_words:
+                return None
+            fingerprint = simhash(tokens)
+            if order is not None:
+                with self._turns:
+                    self._turns.wait_for(lambda: self._next_order >= order)
+            return self._register(canonical_url(url), fingerprint)
+        finally:
+            if order is not None:
+                self.skip(order)
+
+    def _register(self, key, fingerprint):
+        band_values = self._band_values(fingerprint)
+        with self._lock, self._conn:
+            self.stats["checked"] += 1
+            rows = self._conn.execute(
+                "SELECT DISTINCT f.url, f.fingerprint FROM bands b JOIN fingerprints f ON f.url = b.url"
+                f" WHERE ({' OR '.join('(b.band = ? AND b.value = ?)' for _ in band_values)}) AND b.url != ?",
+                [value for pair in band_values for value in pair] + [key]
+            ).fetchall()
+            best = max(((candidate, similarity(fingerprint, stored % (1 << BITS))) for candidate, stored in rows),
+                       key=lambda match: match[1], default=None)
+
+            duplicate_of = best[0] if best and best[1] >= self.threshold else None
+            self._conn.execute(
+                "INSERT OR REPLACE INTO fingerprints (url, fingerprint, duplicate_of, seen_at) VALUES (?, ?, ?, ?)",
+                (key, _signed(fingerprint), duplicate_of, time.time())
+            )
+            # Only canonical copies are looked up, so duplicates never chain
+            self._conn.execute("DELETE FROM bands WHERE url = ?", (key,))
+            if duplicate_of is None:
+                self._conn.executemany("INSERT INTO bands (band, value, url) VALUES (?, ?, ?)",
+                                       [(band, value, key) for band, value in band_values])
+                return None
+            self.stats["duplicates"] += 1
+            return best
+
+    def report(self):
+        """Print how many article bodies were near-duplicates of a canonical copy"""
+        print(f"\n🪞 Near-duplicates: {self.stats['duplicates']} of {self.stats['checked']} articles "
+              f"(≥{self.threshold:.0%} similar)")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,80 @@
+# In-page performance capture
+# Reads Navigation Timing, paint timings and a Resource Timing summary from the
+# browser's Performance API inside the already open session (see page_probe.py)
+# and checks them against per-configuration performance budgets.
+
+# All times are milliseconds from navigation start; missing values are null
+METRICS_SCRIPT = """
+const round = value => (value > 0 ? Math.round(value) : null);
+const metrics = {};
+const nav = performance.getEntriesByType ? performance.getEntriesByType('navigation')[0] : null;
+if (nav) {
+    metrics.ttfb = round(nav.responseStart);
+    metrics.dom_interactive = round(nav.domInteractive);
+    metrics.dom_content_loaded = round(nav.domContentLoadedEventEnd);
+    metrics.load = round(nav.loadEventEnd);
+    metrics.document_bytes = nav.transferSize || null;
+} else if (performance.timing) {
+    const t = performance.timing;
+    metrics.ttfb = round(t.responseStart - t.navigationStart);
+    metrics.dom_interactive = round(t.domInteractive - t.navigationStart);
+    metrics.dom_content_loaded = round(t.domContentLoadedEventEnd - t.navigationStart);
+    metrics.load = round(t.loadEventEnd - t.navigationStart);
+}
+const paints = performance.getEntriesByType ? performance.getEntriesByType('paint') : [];
+for (const paint of paints) {
+    metrics[paint.name.replace(/-/g, '_')] = round(paint.startTime);
+}
+const resources = performance.getEntriesByType ? performance.getEntriesByType('resource') : [];
+let bytes = 0, slowest = 0;
+const byType = {};
+for (const resource of resources) {
+    bytes += resource.transferSize || 0;
+    slowest = Math.max(slowest, resource.duration);
+    const kind = resource.initiatorType || 'other';
+    byType[kind] = byType[kind] || {count: 0, bytes: 0};
+    byType[kind].count += 1;
+    byType[kind].bytes += resource.transferSize || 0;
+}
+metrics.resource_count = resources.length;
+metrics.resource_bytes = bytes;
+metrics.slowest_resource = round(slowest);
+metrics.resources_by_type = byType;
+return metrics;
+"""
+
+# Metrics a budget can limit, in report order
+BUDGET_METRICS = [
+    "ttfb", "first_paint", "first_contentful_paint", "dom_interactive",
+    "dom_content_loaded", "load", "resource_count", "resource_bytes", "slowest_resource"
+]
+
+
+def budget_for(name, budgets):
+    """Budget of one configuration: the defaults overridden by its own entry"""
+    budget = dict(budgets.get("default", {}))
+    budget.update(budgets.get(name, {}))
+    return budget
+
+
+def check_budget(metrics, budget):
+    """Return a description of every metric over its limit; missing metrics are not checked"""
+    violations = []
+    for metric in BUDGET_METRICS:
+        limit = budget.get(metric)
+        value = (metrics or {}).get(metric)
+        if limit is not None and value is not None and value > limit:
+            violations.append(f"{metric} {value} > {limit}")
+    return violations
+
+
+def format_metrics(metrics):
+    """One-line summary for logs"""
+    if not metrics:
+        return "no performance data"
+    parts = []
+    for metric in BUDGET_METRICS:
+        value = metrics.get(metric)
+        if value is not None:
+            parts.append(f"{metric}={value}")
+    return " ".join(parts)
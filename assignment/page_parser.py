@@ -0,0 +1,32 @@
+# Pluggable HTML parser backends
+# Wraps BeautifulSoup so callers can pick a faster backend (lxml when it is
+# installed) and restrict parsing to the subtrees the extractors read.
+
+from bs4 import BeautifulSoup
+
+try:
+    import lxml  # noqa: F401
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+BACKENDS = ["lxml", "html.parser"]
+
+
+def resolve_backend(backend="auto"):
+    """Map 'auto' to the fastest installed backend"""
+    if backend == "auto":
+        return "lxml" if LXML_AVAILABLE else "html.parser"
+    if backend == "lxml" and not LXML_AVAILABLE:
+        raise ValueError("lxml backend requested but lxml is not installed")
+    return backend
+
+
+def available_backends():
+    """Return the backends that can be used in this environment"""
+    return [backend for backend in BACKENDS if backend != "lxml" or LXML_AVAILABLE]
+
+
+def parse_html(markup, backend="auto", scope=None):
+    """Parse markup with the chosen backend, keeping only the scope's subtrees if given"""
+    return BeautifulSoup(markup, resolve_backend(backend), parse_only=scope)
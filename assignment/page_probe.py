@@ -0,0 +1,42 @@
+# Single-round-trip page validation probe
+# Everything the page checks need (title, article count, the first article
+# titles, which language indicators occur and optionally the performance
+# metrics) is computed inside the browser by one script call that returns a
+# small JSON object, instead of pulling page_source over the WebDriver wire
+# and reading each article element separately.
+
+from page_metrics import METRICS_SCRIPT
+
+PROBE_SCRIPT = """
+const [articleSelector, titleSelector, count, indicators, includeMetrics] = arguments;
+const articles = document.querySelectorAll(articleSelector);
+const titles = [];
+for (const article of Array.from(articles).slice(0, count)) {
+    const heading = article.querySelector(titleSelector);
+    titles.push(heading ? (heading.innerText || heading.textContent).trim() : null);
+}
+const html = document.documentElement.outerHTML.toLowerCase();
+let metrics = null;
+if (includeMetrics) {
+    try {
+        metrics = (function () {%s})();
+    } catch (e) {
+        // Browsers without the Performance API still get the page checks
+    }
+}
+return {
+    title: document.title,
+    article_count: articles.length,
+    article_titles: titles,
+    indicators_found: indicators.filter(indicator => html.includes(indicator)),
+    metrics: metrics
+};
+""" % METRICS_SCRIPT
+
+
+def run_probe(driver, indicators, count=5, include_metrics=False,
+              article_selector="article", title_selector="h1, h2, h3"):
+    """Run every page check in the browser and return the compact result dict"""
+    return driver.execute_script(
+        PROBE_SCRIPT, article_selector, title_selector, count, list(indicators), include_metrics
+    )
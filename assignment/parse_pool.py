@@ -0,0 +1,70 @@
+# Process-pool parsing stage
+# BeautifulSoup parsing and the CSS selects hold the GIL, so with concurrent
+# fetching they end up serialized on one core. This stage hands the raw HTML
+# to worker processes, which parse it, apply the readiness predicate and
+# return the compact record of extractors.extract_record instead of a soup
+# tree. A bounded number of pages may be in flight: once it is reached,
+# submitting blocks the fetching thread, so fetched HTML cannot pile up in
+# memory faster than the workers parse it.
+
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from extractors import ARTICLE_SCOPE, extract_record
+from page_parser import parse_html
+
+
+def parse_article(markup, ready, base_url, backend="auto", content_selector=None, image_selectors=None,
+                  target_width=None, formats=()):
+    """Worker: parse an article page; return its extracted record, or None if it fails ready"""
+    page = parse_html(markup, backend, ARTICLE_SCOPE)
+    if ready is not None and not ready.matches(page):
+        return None
+    selectors = {"image_selectors": image_selectors} if image_selectors is not None else {}
+    return extract_record(page, base_url, content_selector, target_width=target_width, formats=formats,
+                          **selectors)
+
+
+class ParsePool:
+    """Worker processes for parsing, with a bounded number of pages in flight"""
+
+    def __init__(self, workers=None, max_in_flight=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_in_flight = max_in_flight or 2 * self.workers
+        self.stats = {"parsed": 0, "backpressure_waits": 0}
+        self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        self._slots = threading.BoundedSemaphore(self.max_in_flight)
+        self._lock = threading.Lock()
+
+    def submit(self, fn, *args, **kwargs):
+        """Queue fn(*args) on a worker, blocking while max_in_flight pages are queued"""
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.stats["backpressure_waits"] += 1
+            self._slots.acquire()
+        try:
+            future = self._executor.submit(fn, *args, **kwargs)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(self._done)
+        return future
+
+    def _done(self, future):
+        self._slots.release()
+        with self._lock:
+            self.stats["parsed"] += 1
+
+    def run(self, fn, *args, **kwargs):
+        """Run fn(*args) on a worker and wait for its result"""
+        return self.submit(fn, *args, **kwargs).result()
+
+    def report(self):
+        """Print how many pages the workers parsed and how often fetching had to wait"""
+        print(f"\n🧮 Parse pool: {self.stats['parsed']} pages parsed by {self.workers} worker processes")
+        print(f"   Fetches held back by a full queue ({self.max_in_flight} in flight): "
+              f"{self.stats['backpressure_waits']}")
+
+    def close(self):
+        self._executor.shutdown()
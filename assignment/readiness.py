@@ -0,0 +1,69 @@
+# Page readiness predicates
+# Replaces fixed sleeps after driver.get(): each page type waits on its own
+# predicate with its own timeout, and every wait is timed so the real
+# readiness distribution can be reported.
+
+import statistics
+import threading
+import time
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import TimeoutException
+
+
+class ReadinessPredicate:
+    """A page is ready once at least min_count elements match css"""
+
+    def __init__(self, name, css, min_count=1, timeout=10):
+        self.name = name
+        self.css = css
+        self.min_count = min_count
+        self.timeout = timeout
+
+    def __call__(self, driver):
+        return len(driver.find_elements(By.CSS_SELECTOR, self.css)) >= self.min_count
+
+    def matches(self, page):
+        """Apply the same check to an already parsed BeautifulSoup page"""
+        return len(page.select(self.css, limit=self.min_count)) >= self.min_count
+
+    def __repr__(self):
+        return f"≥{self.min_count} '{self.css}'"
+
+
+class ReadinessWaiter:
+    """Wait on readiness predicates and record how long each wait took"""
+
+    def __init__(self, poll_frequency=0.1):
+        self.poll_frequency = poll_frequency
+        self.durations = {}
+        self.timeouts = {}
+        self._lock = threading.Lock()
+
+    def wait(self, driver, predicate):
+        """Block until predicate holds or its timeout expires; return whether it held"""
+        start = time.perf_counter()
+        try:
+            WebDriverWait(driver, predicate.timeout, poll_frequency=self.poll_frequency).until(predicate)
+            ready = True
+        except TimeoutException:
+            ready = False
+        elapsed = time.perf_counter() - start
+
+        with self._lock:
+            self.durations.setdefault(predicate.name, []).append(elapsed)
+            if not ready:
+                self.timeouts[predicate.name] = self.timeouts.get(predicate.name, 0) + 1
+        return ready
+
+    def report(self):
+        """Print the wait-time distribution of every predicate used"""
+        if not self.durations:
+            return
+        print("\n⏱️ Page readiness waits:")
+        for name, durations in self.durations.items():
+            ordered = sorted(durations)
+            p90 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.9))]
+            print(f"   {name}: {len(ordered)} waits, min {ordered[0]:.2f}s, "
+                  f"median {statistics.median(ordered):.2f}s, p90 {p90:.2f}s, max {ordered[-1]:.2f}s, "
+                  f"timeouts {self.timeouts.get(name, 0)}")
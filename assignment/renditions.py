@@ -0,0 +1,97 @@
+# Cover image rendition selection
+# Reads the renditions an <img> offers through srcset and a surrounding
+# <picture>'s <source> elements and picks the smallest one that is at least
+# the target width, in the most preferred format, instead of the default src.
+# Format only decides between renditions of about the same width, so a much
+# wider WebP never beats a JPEG that is already wide enough.
+
+import os
+from urllib.parse import urlparse
+
+# File extensions and MIME subtypes mapped to one format name
+FORMAT_ALIASES = {"jpg": "jpeg", "jpeg": "jpeg", "png": "png", "webp": "webp", "avif": "avif", "gif": "gif"}
+
+# How much wider than the narrowest wide-enough rendition a preferred format may be
+WIDTH_TOLERANCE = 0.25
+
+
+def parse_srcset(value):
+    """Return (url, width or None) for every candidate of a srcset attribute"""
+    candidates = []
+    position, length = 0, len(value or "")
+    while position < length:
+        # Candidates are separated by commas and whitespace
+        while position < length and (value[position].isspace() or value[position] == ","):
+            position += 1
+        start = position
+        while position < length and not value[position].isspace():
+            position += 1
+        url = value[start:position]
+        if not url:
+            break
+
+        descriptor = ""
+        if url.endswith(","):
+            url = url.rstrip(",")
+        else:
+            end = value.find(",", position)
+            end = length if end == -1 else end
+            descriptor = value[position:end].strip()
+            position = end + 1
+
+        width = int(descriptor[:-1]) if descriptor.endswith("w") and descriptor[:-1].isdigit() else None
+        candidates.append((url, width))
+    return candidates
+
+
+def image_format(url, mime_type=None):
+    """Format name of a rendition from its <source type> or URL extension, or None"""
+    if mime_type and "/" in mime_type:
+        return FORMAT_ALIASES.get(mime_type.split("/", 1)[1].lower())
+    extension = os.path.splitext(urlparse(url).path)[1].lstrip(".").lower()
+    return FORMAT_ALIASES.get(extension)
+
+
+def rendition_candidates(img_tag):
+    """(url, width or None, format or None) of every rendition offered for an <img>"""
+    candidates = []
+    # lxml does not treat <source> as a void element, so the <img> ends up nested in the sources
+    picture = img_tag.parent
+    while picture is not None and picture.name == "source":
+        picture = picture.parent
+    if picture is not None and picture.name == "picture":
+        for source in picture.find_all("source"):
+            srcset = source.get("srcset") or source.get("data-srcset")
+            for url, width in parse_srcset(srcset):
+                candidates.append((url, width, image_format(url, source.get("type"))))
+
+    for url, width in parse_srcset(img_tag.get("srcset") or img_tag.get("data-srcset")):
+        candidates.append((url, width, image_format(url)))
+
+    src = img_tag.get("src")
+    if src:
+        width = img_tag.get("width")
+        candidates.append((src, int(width) if str(width).isdigit() else None, image_format(src)))
+    return candidates
+
+
+def choose_rendition(img_tag, target_width, formats, tolerance=WIDTH_TOLERANCE):
+    """URL of the best rendition, or None when no candidate declares its width
+
+    Among the renditions at least target_width wide, those within tolerance of
+    the narrowest one are considered, and the most preferred format wins,
+    taking its narrowest rendition; if none is wide enough, the widest is used.
+    """
+    sized = [candidate for candidate in rendition_candidates(img_tag) if candidate[1]]
+    if not sized:
+        return None
+
+    def rank(fmt):
+        return formats.index(fmt) if fmt in formats else len(formats)
+
+    wide_enough = [candidate for candidate in sized if candidate[1] >= target_width]
+    if wide_enough:
+        limit = min(candidate[1] for candidate in wide_enough) * (1 + tolerance)
+        close = [candidate for candidate in wide_enough if candidate[1] <= limit]
+        return min(close, key=lambda candidate: (rank(candidate[2]), candidate[1]))[0]
+    return max(sized, key=lambda candidate: (candidate[1], -rank(candidate[2])))[0]
@@ -0,0 +1,148 @@
+# Append-only run history
+# Every BrowserStack run and each of its (browser, URL) results are appended to
+# a SQLite database with numeric durations, per-step timings, page performance
+# metrics, session ids, build name and timestamps, indexed for queries by
+# browser and time. runs holds one row per run with its totals; results one
+# row per (browser, URL) check; steps and metrics the per-step timings and
+# page metrics of each check, keyed by run_id and browser.
+
+import os
+import sqlite3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    started_at REAL NOT NULL,
+    finished_at REAL NOT NULL,
+    total_time REAL NOT NULL,
+    build_name TEXT,
+    project_name TEXT,
+    target_url TEXT,
+    total_tests INTEGER,
+    passed INTEGER,
+    failed INTEGER
+);
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY,
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    recorded_at REAL NOT NULL,
+    build_name TEXT,
+    browser TEXT NOT NULL,
+    url TEXT,
+    status TEXT NOT NULL,
+    duration REAL,
+    session_start REAL,
+    session_id TEXT,
+    retries INTEGER,
+    articles_found INTEGER,
+    title TEXT,
+    spanish_content INTEGER,
+    error TEXT
+);
+CREATE TABLE IF NOT EXISTS steps (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    browser TEXT NOT NULL,
+    url TEXT,
+    step TEXT NOT NULL,
+    duration REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS metrics (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    recorded_at REAL NOT NULL,
+    browser TEXT NOT NULL,
+    url TEXT,
+    metric TEXT NOT NULL,
+    value REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_browser_time ON results (browser, recorded_at);
+CREATE INDEX IF NOT EXISTS results_time ON results (recorded_at);
+CREATE INDEX IF NOT EXISTS results_run ON results (run_id);
+CREATE INDEX IF NOT EXISTS steps_run ON steps (run_id, browser);
+CREATE INDEX IF NOT EXISTS runs_time ON runs (started_at);
+CREATE INDEX IF NOT EXISTS metrics_browser_time ON metrics (browser, metric, recorded_at);
+"""
+
+
+class RunHistory:
+    """SQLite store of every test run, its results and their step timings"""
+
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path)
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+
+    def record_run(self, summary, results, steps):
+        """Append one run in a single transaction and return its id
+
+        summary: started_at, finished_at, total_time, build_name, project_name,
+                 target_url, total_tests, passed, failed
+        results: result dicts as produced by browserstack_test.run_test
+        steps:   (browser, url or None, step, seconds) tuples
+        """
+        with self._conn:
+            cursor = self._conn.execute(
+                "INSERT INTO runs (started_at, finished_at, total_time, build_name, project_name,"
+                " target_url, total_tests, passed, failed) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (summary["started_at"], summary["finished_at"], summary["total_time"],
+                 summary.get("build_name"), summary.get("project_name"), summary.get("target_url"),
+                 summary["total_tests"], summary["passed"], summary["failed"])
+            )
+            run_id = cursor.lastrowid
+            recorded_at = summary["finished_at"]
+
+            self._conn.executemany(
+                "INSERT INTO results (run_id, recorded_at, build_name, browser, url, status, duration,"
+                " session_start, session_id, retries, articles_found, title, spanish_content, error)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(run_id, recorded_at, summary.get("build_name"), r["browser"], r.get("url"), r["status"],
+                  r.get("duration"), r.get("session_start"), r.get("session_id"), r.get("retries"),
+                  r.get("articles_found"), r.get("title"),
+                  None if r.get("spanish_content") is None else int(r["spanish_content"]), r.get("error"))
+                 for r in results]
+            )
+            self._conn.executemany(
+                "INSERT INTO steps (run_id, browser, url, step, duration) VALUES (?, ?, ?, ?, ?)",
+                [(run_id,) + tuple(step) for step in steps]
+            )
+            # Numeric page performance metrics, one row each
+            self._conn.executemany(
+                "INSERT INTO metrics (run_id, recorded_at, browser, url, metric, value) VALUES (?, ?, ?, ?, ?, ?)",
+                [(run_id, recorded_at, r["browser"], r.get("url"), metric, value)
+                 for r in results
+                 for metric, value in (r.get("metrics") or {}).items()
+                 if isinstance(value, (int, float)) and not isinstance(value, bool)]
+            )
+        return run_id
+
+    def iter_results(self, browser=None, since=None):
+        """Yield result rows as dicts in time order without loading them all"""
+        query = "SELECT * FROM results"
+        clauses, params = [], []
+        if browser:
+            clauses.append("browser = ?")
+            params.append(browser)
+        if since:
+            clauses.append("recorded_at >= ?")
+            params.append(since)
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        cursor = self._conn.execute(query + " ORDER BY recorded_at, id", params)
+        columns = [column[0] for column in cursor.description]
+        for row in cursor:
+            yield dict(zip(columns, row))
+
+    def expected_job_durations(self, last_runs=20):
+        """Average per-browser session time (start-up plus checks) over the most recent runs"""
+        rows = self._conn.execute(
+            "SELECT browser, AVG(job_time) FROM ("
+            "  SELECT run_id, browser, MAX(COALESCE(session_start, 0)) + SUM(COALESCE(duration, 0)) AS job_time"
+            "  FROM results WHERE run_id IN (SELECT id FROM runs ORDER BY started_at DESC LIMIT ?)"
+            "  GROUP BY run_id, browser"
+            ") GROUP BY browser",
+            (last_runs,)
+        ).fetchall()
+        return {browser: seconds for browser, seconds in rows}
+
+    def close(self):
+        self._conn.close()
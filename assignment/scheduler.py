@@ -0,0 +1,69 @@
+# History-driven parallel scheduler for the browser matrix
+# Jobs run on a worker pool capped at the plan's parallel-session limit and are
+# started longest-expected-first, using durations from previous result files,
+# which keeps the total wall-clock time of a large matrix close to optimal.
+
+import glob
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+
+def parse_seconds(value):
+    """Read a duration stored either as a number or as a '12.34s' string"""
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str) and value.endswith("s"):
+        try:
+            return float(value[:-1])
+        except ValueError:
+            return None
+    return None
+
+
+def load_expected_durations(pattern):
+    """Average per-browser job duration over every result file matching pattern"""
+    runs = {}
+    for path in glob.glob(pattern):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            continue
+
+        # A job is one browser session: its start-up plus all of its URL checks
+        job_totals = {}
+        for result in data.get("results", []):
+            browser = result.get("browser")
+            seconds = parse_seconds(result.get("execution_time"))
+            if browser is None or seconds is None:
+                continue
+            if browser not in job_totals:
+                job_totals[browser] = parse_seconds(result.get("session_start_time")) or 0.0
+            job_totals[browser] += seconds
+
+        for browser, total in job_totals.items():
+            runs.setdefault(browser, []).append(total)
+
+    return {browser: sum(totals) / len(totals) for browser, totals in runs.items()}
+
+
+def order_jobs(jobs, expected):
+    """Sort (name, ...) jobs longest expected first; unseen jobs count as the longest known"""
+    default = max(expected.values()) if expected else 0.0
+    return sorted(jobs, key=lambda job: expected.get(job[0], default), reverse=True)
+
+
+def run_scheduled(jobs, run_job, parallel_limit, expected):
+    """Run every job on a pool of parallel_limit workers in longest-first order"""
+    ordered = order_jobs(jobs, expected)
+
+    print(f"Scheduling {len(ordered)} jobs on {parallel_limit} parallel sessions:")
+    for job in ordered:
+        estimate = expected.get(job[0])
+        print(f"  - {job[0]}: {f'~{estimate:.1f}s' if estimate is not None else 'no history'}")
+
+    # The executor queue is FIFO, so submission order is start order
+    with ThreadPoolExecutor(max_workers=parallel_limit) as executor:
+        futures = [executor.submit(run_job, *job) for job in ordered]
+        for future in futures:
+            future.result()
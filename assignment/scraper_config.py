@@ -0,0 +1,108 @@
+# Scraper Configuration
+# This file contains all the settings used by main.py
+
+import os
+
+# Override to run against a fixture_server.py replay instead of the live site
+BASE_URL = os.getenv("ELPAIS_BASE_URL", "https://elpais.com").rstrip("/")
+
+# Scraper Settings
+SCRAPER_CONFIG = {
+    "base_url": BASE_URL,
+    "listing_url": f"{BASE_URL}/opinion/",
+    "output_dir": "articles_data",
+    # Single article database; EXPORT_FOLDERS=1 also writes the article_<n>/ folders
+    "article_store": os.path.join("articles_data", "articles.sqlite"),
+    "export_folders": os.getenv("EXPORT_FOLDERS", "0") == "1",
+    # Word index over every stored title and body (see inverted_index.py)
+    "search_index": os.path.join("articles_data", "search_index.sqlite"),
+    # Articles whose body SimHash is at least this similar to an earlier one are
+    # linked to it instead of stored (see near_duplicates.py). With 8 bands of
+    # 8 bits every pair below 8 differing bits (~0.88) is found.
+    "near_duplicate_threshold": 0.9,
+    "near_duplicate_bands": 8,
+    "near_duplicate_min_words": 50,
+    "cache_dir": ".scraper_cache",
+    "image_store_dir": os.path.join("articles_data", ".image_store"),
+    "max_articles": 5,
+    "concurrency": 4,
+    "request_timeout": 15,
+    # Requests per second (and burst) allowed against any one host
+    "per_host_rate": 2.0,
+    "per_host_burst": 4,
+    # Articles written to the store per transaction
+    "store_batch_size": 100,
+    "readiness_timeouts": {"listing": 10, "article": 10},
+    "parser_backend": "auto",
+    # Worker processes that parse article pages (see parse_pool.py); 0 parses
+    # in the fetching threads. At most parse_max_in_flight pages wait for a worker.
+    "parse_workers": int(os.getenv("PARSE_WORKERS", "0")),
+    "parse_max_in_flight": 8,
+    # Selector plans are reset when the leading selector matches fewer than
+    # min_hit_rate of the last `window` pages of a template
+    "selector_plan_window": 20,
+    "selector_plan_min_hit_rate": 0.5,
+    "translator_base_url": os.getenv("TRANSLATOR_BASE_URL"),
+    "translation_cache_size": 10000,
+    "translation_batch_chars": 4500,
+    # Article bodies are translated as chunks of at most this many characters,
+    # several at once under a request rate limit (see BodyTranslator);
+    # TRANSLATE_BODIES=0 translates titles only
+    "translate_bodies": os.getenv("TRANSLATE_BODIES", "1") != "0",
+    "body_chunk_chars": 4500,
+    "body_translation_concurrency": 4,
+    "translator_rate": 5.0,
+    "translator_burst": 5,
+    "translation_retries": 3,
+    # Cover rendition: narrowest srcset/<picture> candidate at least this wide,
+    # in the first available format of this list
+    "image_target_width": 1200,
+    "image_formats": ["webp", "jpeg", "png"],
+    "headers": {
+        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
+        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+        "Accept-Language": "es-ES,es;q=0.9"
+    }
+}
+
+# Multi-section crawl (see crawl_frontier.py); CRAWL=1 replaces the single
+# Opinion listing with the articles discovered from these seed sections
+CRAWL_CONFIG = {
+    "enabled": os.getenv("CRAWL", "0") == "1",
+    "seed_sections": [
+        f"{BASE_URL}/opinion/",
+        f"{BASE_URL}/espana/",
+        f"{BASE_URL}/internacional/",
+        f"{BASE_URL}/economia/"
+    ],
+    "max_depth": 5,
+    "max_articles": 1000,
+    # Runs an article is retried on before it is marked failed
+    "max_attempts": 3,
+    "pagination_selector": 'a[rel~="next"]',
+    "pagination_pattern": r"/\d+/?$",
+    "frontier_path": os.path.join(".scraper_cache", "frontier.sqlite")
+}
+
+# Fast-load mode for the local Chrome drivers of main.py and local_test.py
+# (see fast_load.py); set FAST_LOAD=0 to load pages with every resource
+FAST_LOAD_CONFIG = {
+    "enabled": os.getenv("FAST_LOAD", "1") != "0",
+    "page_load_strategy": "eager",
+    "blocked_resource_types": ["Image", "Media", "Font"],
+    "blocked_url_patterns": [
+        "*doubleclick.net*",
+        "*googlesyndication.com*",
+        "*googletagmanager.com*",
+        "*google-analytics.com*",
+        "*adservice.google.*",
+        "*amazon-adsystem.com*",
+        "*chartbeat.*",
+        "*scorecardresearch.com*",
+        "*facebook.net*",
+        "*outbrain.com*",
+        "*taboola.com*",
+        "*criteo.*",
+        "*permutive.*"
+    ]
+}
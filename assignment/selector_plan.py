@@ -0,0 +1,108 @@
+# Adaptive selector plans
+# For every (domain, page template) the plan remembers which of a list of
+# alternative selectors actually matched and tries the best one first on later
+# pages, falling back to the others in ranked order. Alternatives whose matches
+# are all kept (the content paragraphs) are learned as the combination that
+# matched, so that selector list alone can run on later pages. Pages where
+# nothing matched are not recorded. Plans persist as JSON across runs; when
+# the first-ranked selector stops matching often enough the plan is reset,
+# which usually means the site layout changed.
+
+import json
+import os
+import threading
+from urllib.parse import urlparse
+
+
+def plan_key(url):
+    """(domain, template) key of a page: host plus its first path segment (the section)"""
+    parsed = urlparse(url or "")
+    domain = parsed.netloc.lower()
+    if domain.startswith("www."):
+        domain = domain[4:]
+    segments = [segment for segment in parsed.path.split("/") if segment]
+    return f"{domain}/{segments[0] if segments else ''}"
+
+
+class SelectorPlan:
+    """Per-template ranking of alternative selectors, learned from which one matched"""
+
+    def __init__(self, path, window=20, min_hit_rate=0.5):
+        self.path = path
+        self.window = window
+        self.min_hit_rate = min_hit_rate
+        self.invalidated = []
+        self._lock = threading.Lock()
+        self.plans = {}
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self.plans = json.load(f)
+            except (OSError, ValueError):
+                self.plans = {}
+
+    def _entry(self, key, kind):
+        return self.plans.setdefault(key, {}).setdefault(kind, {"hits": {}, "recent": [], "resets": 0})
+
+    def ranked(self, key, kind, selectors):
+        """Selectors ordered by how often they matched, ties in their given order"""
+        with self._lock:
+            hits = dict(self._entry(key, kind)["hits"])
+        return sorted(selectors, key=lambda selector: -hits.get(selector, 0))
+
+    def leader(self, url, kind):
+        """The selector that matched most often on url's template, or None before any match"""
+        with self._lock:
+            hits = self._entry(plan_key(url), kind)["hits"]
+            return max(hits, key=hits.get) if hits else None
+
+    def first_match(self, page, url, kind, selectors, extract):
+        """Return the first non-empty extract(page, selector) in ranked order, or None"""
+        key = plan_key(url)
+        order = self.ranked(key, kind, selectors)
+        for position, selector in enumerate(order):
+            value = extract(page, selector)
+            if value:
+                self._record(key, kind, selector, position == 0)
+                return value
+        return None
+
+    def record(self, url, kind, selector, first_hit):
+        """Record a match found elsewhere (e.g. in a parse worker); selector None means nothing matched"""
+        if selector is not None:
+            self._record(plan_key(url), kind, selector, first_hit)
+
+    def _record(self, key, kind, selector, first_hit):
+        with self._lock:
+            entry = self._entry(key, kind)
+            entry["hits"][selector] = entry["hits"].get(selector, 0) + 1
+            entry["recent"] = (entry["recent"] + [1 if first_hit else 0])[-self.window:]
+
+            # A full window where the leading selector rarely matched invalidates the plan
+            recent = entry["recent"]
+            if len(recent) == self.window and sum(recent) / len(recent) < self.min_hit_rate:
+                entry["hits"] = {}
+                entry["recent"] = []
+                entry["resets"] += 1
+                self.invalidated.append((key, kind))
+
+    def save(self):
+        """Write the plans atomically"""
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with self._lock:
+            with open(self.path + ".tmp", 'w', encoding='utf-8') as f:
+                json.dump(self.plans, f, indent=2, sort_keys=True)
+            os.replace(self.path + ".tmp", self.path)
+
+    def report(self):
+        """Print the leading selector and first-try hit rate of every plan"""
+        print(f"\n🧭 Selector plans: {len(self.plans)} templates")
+        for key, kinds in sorted(self.plans.items()):
+            for kind, entry in sorted(kinds.items()):
+                if not entry["hits"]:
+                    continue
+                best = max(entry["hits"], key=entry["hits"].get)
+                rate = sum(entry["recent"]) / len(entry["recent"]) if entry["recent"] else 0.0
+                print(f"   {key} {kind}: '{best}' first-try hit rate {rate:.0%}")
+        for key, kind in self.invalidated:
+            print(f"   ⚠️ Plan reset for {key} {kind}: leading selector stopped matching (layout change?)")
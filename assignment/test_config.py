@@ -6,6 +6,9 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+# Override to run against a fixture_server.py replay instead of the live site
+ELPAIS_BASE_URL = os.getenv("ELPAIS_BASE_URL", "https://elpais.com").rstrip("/")
+
 # BrowserStack Configuration
 BROWSERSTACK_CONFIG = {
     "username": os.getenv("BROWSERSTACK_USERNAME"),
@@ -17,13 +20,53 @@ BROWSERSTACK_CONFIG = {
 
 # Test Configuration
 TEST_CONFIG = {
-    "target_url": "https://elpais.com/opinion/",
+    "target_url": f"{ELPAIS_BASE_URL}/opinion/",
+    # Every browser session checks all of these URLs; sample_articles adds the
+    # first N article links found on that page as extra targets
+    "targets": [
+        {"url": f"{ELPAIS_BASE_URL}/opinion/", "min_articles": 5, "sample_articles": 2},
+        {"url": f"{ELPAIS_BASE_URL}/espana/", "min_articles": 5},
+        {"url": f"{ELPAIS_BASE_URL}/internacional/", "min_articles": 5},
+        {"url": f"{ELPAIS_BASE_URL}/economia/", "min_articles": 5}
+    ],
     "min_articles": 5,
     "page_load_timeout": 20,
     "implicit_wait": 15,
     "max_retries": 3,
     "spanish_indicators": ["opinión", "artículo", "español", "país"],
-    "expected_title_keywords": ["EL PAÍS", "Opinión"]
+    "expected_title_keywords": ["EL PAÍS", "Opinión"],
+    # Scheduler: sessions running at once (your plan's parallel limit), session
+    # creation rate/burst, and the result files used to estimate job durations
+    # when the run history database is still empty
+    "parallel_limit": int(os.getenv("BROWSERSTACK_PARALLEL_LIMIT", "5")),
+    "session_start_rate": 1.0,
+    "session_start_burst": 2,
+    "history_files": "browserstack_test_results*.json",
+    # Append-only SQLite history of every run (see run_history.py)
+    "history_db": "results_history.sqlite"
+}
+
+# Performance budgets per browser configuration ("local" for local_test.py).
+# Times are milliseconds from navigation start, sizes are bytes; a check whose
+# page exceeds any limit fails. Entries override the defaults.
+PERFORMANCE_BUDGETS = {
+    "default": {
+        "ttfb": 2000,
+        "first_contentful_paint": 4000,
+        "dom_content_loaded": 8000,
+        "load": 20000,
+        "resource_bytes": 15000000
+    },
+    "Mobile-GalaxyS22": {
+        "first_contentful_paint": 6000,
+        "dom_content_loaded": 12000,
+        "load": 30000
+    },
+    "Mobile-iPhone13": {
+        "first_contentful_paint": 6000,
+        "dom_content_loaded": 12000,
+        "load": 30000
+    }
 }
 
 # Browser Capabilities
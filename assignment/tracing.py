@@ -0,0 +1,97 @@
+# Lightweight span tracing
+# Nested, thread-aware timing spans exported as a Chrome trace file
+# (open in chrome://tracing or https://ui.perfetto.dev). Only the first
+# TRACE_MAX_SPANS spans of a run are kept, so a long crawl cannot grow the
+# trace without bound; the rest are counted as dropped.
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+TRACE_DIR = os.getenv("TRACE_DIR", "traces")
+TRACE_MAX_SPANS = int(os.getenv("TRACE_MAX_SPANS", "50000"))
+
+
+class Tracer:
+    """Collect nested spans from any number of threads, up to max_spans"""
+
+    def __init__(self, max_spans=TRACE_MAX_SPANS):
+        self.max_spans = max_spans
+        self.spans = []
+        self.dropped = 0
+        self._origin = time.perf_counter()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _stack(self):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    @contextmanager
+    def span(self, name, **attrs):
+        """Time the enclosed block as a child of the current thread's open span"""
+        stack = self._stack()
+        parent = stack[-1] if stack else None
+        # Attributes of enclosing spans (e.g. browser) are inherited
+        inherited = dict(parent["args"]) if parent else {}
+        inherited.update(attrs)
+        record = {"name": name, "args": inherited, "parent": parent["name"] if parent else None}
+        stack.append(record)
+        start = time.perf_counter()
+        try:
+            yield record
+        except Exception as e:
+            record["args"]["error"] = str(e)
+            raise
+        finally:
+            end = time.perf_counter()
+            stack.pop()
+            thread = threading.current_thread()
+            record.update({
+                "start": start - self._origin,
+                "duration": end - start,
+                "tid": thread.ident,
+                "thread": thread.name,
+                "depth": len(stack)
+            })
+            with self._lock:
+                if len(self.spans) < self.max_spans:
+                    self.spans.append(record)
+                else:
+                    self.dropped += 1
+
+    def export(self, prefix):
+        """Write all spans to TRACE_DIR/<prefix>_<timestamp>.json in Chrome trace format"""
+        os.makedirs(TRACE_DIR, exist_ok=True)
+        path = os.path.join(TRACE_DIR, f"{prefix}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+        pid = os.getpid()
+
+        with self._lock:
+            spans = list(self.spans)
+            dropped = self.dropped
+        events = []
+        for tid, thread in {(r["tid"], r["thread"]) for r in spans}:
+            events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": thread}})
+        for record in spans:
+            events.append({
+                "name": record["name"],
+                "ph": "X",
+                "pid": pid,
+                "tid": record["tid"],
+                "ts": record["start"] * 1e6,
+                "dur": record["duration"] * 1e6,
+                "args": {key: str(value) for key, value in record["args"].items()}
+            })
+
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms", "otherData": {"dropped_spans": dropped}}, f)
+        return path
+
+
+# Process-wide tracer shared by every module
+tracer = Tracer()
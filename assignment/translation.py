@@ -0,0 +1,348 @@
+# Batched translation with a persistent on-disk cache
+# Texts are deduplicated, looked up in a SQLite cache keyed by language pair and
+# text hash, and only the misses are sent to the translator in batches. Long
+# bodies are split at paragraph and sentence boundaries into size-limited
+# chunks that are translated concurrently and reassembled in order.
+
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from deep_translator import GoogleTranslator
+
+from rate_limit import TokenBucket
+
+# A sentence ends at . ! ? or … (optionally followed by a closing quote) and whitespace
+SENTENCE_END = re.compile(r'(?<=[.!?…])["»”’)]*\s+')
+
+
+def text_hash(text):
+    """Stable cache key for a piece of text"""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class TranslationCache:
+    """Size-bounded SQLite cache of translations with least-recently-used eviction"""
+
+    def __init__(self, path, max_entries=10000):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS translations ("
+            " source TEXT NOT NULL, target TEXT NOT NULL, text_hash TEXT NOT NULL,"
+            " translated TEXT NOT NULL, last_used REAL NOT NULL,"
+            " PRIMARY KEY (source, target, text_hash))"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS translations_last_used ON translations (last_used)"
+        )
+        self._conn.commit()
+
+    def get(self, source, target, text):
+        """Return the cached translation of text, or None"""
+        key = text_hash(text)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT translated FROM translations WHERE source = ? AND target = ? AND text_hash = ?",
+                (source, target, key)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._conn.execute(
+                "UPDATE translations SET last_used = ? WHERE source = ? AND target = ? AND text_hash = ?",
+                (time.time(), source, target, key)
+            )
+            self._conn.commit()
+            return row[0]
+
+    def put_many(self, source, target, translations):
+        """Store (text, translated) pairs and evict the oldest entries past the size bound"""
+        now = time.time()
+        rows = [(source, target, text_hash(text), translated, now) for text, translated in translations]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO translations VALUES (?, ?, ?, ?, ?)", rows
+            )
+            count = self._conn.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+            if count > self.max_entries:
+                self._conn.execute(
+                    "DELETE FROM translations WHERE rowid IN ("
+                    " SELECT rowid FROM translations ORDER BY last_used LIMIT ?)",
+                    (count - self.max_entries,)
+                )
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class StubTranslator:
+    """Offline stand-in for GoogleTranslator that tags every line"""
+
+    def __init__(self, source='es', target='en', latency=0.0):
+        self.prefix = f"[{target}] "
+        self.latency = latency
+
+    def translate(self, text):
+        if self.latency:
+            time.sleep(self.latency)
+        return "\n".join(self.prefix + line for line in text.split("\n"))
+
+
+class BatchTranslator:
+    """Translate many texts with deduplication, caching and batched requests"""
+
+    def __init__(self, source='es', target='en', cache=None, batch_chars=4500, base_url=None,
+                 translator=None):
+        self.source = source
+        self.target = target
+        self.cache = cache
+        self.batch_chars = batch_chars
+        self.requests_sent = 0
+        self._translator = translator or GoogleTranslator(source=source, target=target)
+        if base_url:
+            # e.g. a fixture_server.py replay of translate.google.com
+            self._translator._base_url = base_url
+
+    def translate_many(self, texts):
+        """Return a {text: translation} dict; failed texts map to None"""
+        results = {}
+        pending = []
+        for text in dict.fromkeys(texts):
+            cached = self.cache.get(self.source, self.target, text) if self.cache else None
+            if cached is not None:
+                results[text] = cached
+            else:
+                pending.append(text)
+
+        translated = []
+        for batch in self._batches(pending):
+            for text, translation in zip(batch, self._translate_batch(batch)):
+                results[text] = translation
+                if translation is not None:
+                    translated.append((text, translation))
+
+        if self.cache and translated:
+            self.cache.put_many(self.source, self.target, translated)
+        return results
+
+    def _batches(self, texts):
+        """Pack single-line texts into newline-joined batches under the request size limit"""
+        batch, size = [], 0
+        for text in texts:
+            if "\n" in text or len(text) >= self.batch_chars:
+                # Cannot be split back out of a joined response; send on its own
+                yield [text]
+                continue
+            if batch and size + len(text) + 1 > self.batch_chars:
+                yield batch
+                batch, size = [], 0
+            batch.append(text)
+            size += len(text) + 1
+        if batch:
+            yield batch
+
+    def _translate_batch(self, batch):
+        """Translate a batch in one request, falling back to one request per text"""
+        if len(batch) > 1:
+            try:
+                self.requests_sent += 1
+                lines = self._translator.translate("\n".join(batch)).split("\n")
+                if len(lines) == len(batch):
+                    return [line.strip() for line in lines]
+            except Exception as e:
+                print(f"⚠️ Batch translation failed ({e}), translating one by one")
+
+        translations = []
+        for text in batch:
+            try:
+                self.requests_sent += 1
+                translations.append(self._translator.translate(text))
+            except Exception as e:
+                print(f"❌ Error translating '{text[:50]}': {e}")
+                translations.append(None)
+        return translations
+
+    def report(self):
+        """Print cache hit/miss counters and translator request count"""
+        print(f"\n💾 Translation requests sent: {self.requests_sent}")
+        if self.cache:
+            print(f"   Cache hits: {self.cache.hits}")
+            print(f"   Cache misses: {self.cache.misses}")
+
+
+def _units(text, max_chars):
+    """(piece, separator after it) for every sentence of every paragraph, none longer than max_chars"""
+    units = []
+    paragraphs = text.split("\n")
+    for index, paragraph in enumerate(paragraphs):
+        paragraph_end = "\n" if index < len(paragraphs) - 1 else ""
+        sentences = [paragraph] if len(paragraph) <= max_chars else _sentences(paragraph)
+        for position, sentence in enumerate(sentences):
+            pieces = _hard_split(sentence, max_chars)
+            for piece_index, piece in enumerate(pieces):
+                last = position == len(sentences) - 1 and piece_index == len(pieces) - 1
+                units.append((piece, paragraph_end if last else " "))
+    return units
+
+
+def _sentences(paragraph):
+    """Split a paragraph after each sentence end, keeping the closing punctuation"""
+    sentences, start = [], 0
+    for match in SENTENCE_END.finditer(paragraph):
+        sentences.append(paragraph[start:match.start() + len(match.group(0).rstrip())])
+        start = match.end()
+    sentences.append(paragraph[start:])
+    return [sentence for sentence in sentences if sentence] or [paragraph]
+
+
+def _hard_split(sentence, max_chars):
+    """Cut a sentence longer than max_chars at the last space before the limit"""
+    pieces = []
+    while len(sentence) > max_chars:
+        cut = sentence.rfind(" ", 0, max_chars)
+        cut = cut if cut > 0 else max_chars
+        pieces.append(sentence[:cut])
+        sentence = sentence[cut:].lstrip(" ")
+    pieces.append(sentence)
+    return pieces
+
+
+def split_chunks(text, max_chars=4500):
+    """Pack a text into (chunk, separator after it) pairs of at most max_chars
+
+    Chunks break between paragraphs or sentences, so joining every chunk with
+    its separator gives the text back (up to whitespace between sentences).
+    """
+    chunks = []
+    current, current_end = "", ""
+    for piece, separator in _units(text, max_chars):
+        if current and len(current) + len(current_end) + len(piece) > max_chars:
+            chunks.append((current, current_end))
+            current, current_end = "", ""
+        if current:
+            current = current + current_end + piece
+        elif piece:
+            # Empty paragraphs at a chunk boundary become an empty chunk, sent to no translator
+            if current_end:
+                chunks.append(("", current_end))
+            current = piece
+        else:
+            current_end += separator
+            continue
+        current_end = separator
+    if current or current_end or not chunks:
+        chunks.append((current, current_end))
+    return chunks
+
+
+class BodyTranslator:
+    """Translate long texts as size-limited chunks, sent concurrently under a rate limit
+
+    All chunks of all texts go to one thread pool at once, so a text takes about
+    as long as its slowest chunk. Failed chunks are retried with exponential
+    backoff; a text with a chunk that still fails maps to None. translator_factory
+    builds one translator per worker thread (default: GoogleTranslator); pass a
+    factory returning StubTranslator to run offline.
+    """
+
+    def __init__(self, source='es', target='en', cache=None, chunk_chars=4500, concurrency=4,
+                 rate=5.0, burst=5, retries=3, backoff=1.0, base_url=None, translator_factory=None):
+        self.source = source
+        self.target = target
+        self.cache = cache
+        self.chunk_chars = chunk_chars
+        self.concurrency = concurrency
+        self.retries = retries
+        self.backoff = backoff
+        self.base_url = base_url
+        self.translator_factory = translator_factory
+        self.stats = {"chunks": 0, "requests": 0, "retries": 0, "failed": 0}
+        self._bucket = TokenBucket(rate, burst)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def _translator(self):
+        """Return the translator of the calling thread"""
+        translator = getattr(self._local, "translator", None)
+        if translator is None:
+            if self.translator_factory:
+                translator = self.translator_factory()
+            else:
+                translator = GoogleTranslator(source=self.source, target=self.target)
+                if self.base_url:
+                    translator._base_url = self.base_url
+            self._local.translator = translator
+        return translator
+
+    def _count(self, key):
+        with self._lock:
+            self.stats[key] += 1
+
+    def _translate_chunk(self, chunk):
+        """Translate one chunk, retrying with exponential backoff; None after the last failure"""
+        if not chunk.strip():
+            return chunk
+        for attempt in range(self.retries + 1):
+            self._bucket.acquire()
+            self._count("requests")
+            try:
+                return self._translator().translate(chunk)
+            except Exception as e:
+                if attempt == self.retries:
+                    print(f"❌ Error translating chunk '{chunk[:50]}': {e}")
+                    self._count("failed")
+                    return None
+                self._count("retries")
+                time.sleep(self.backoff * 2 ** attempt)
+
+    def translate_many(self, texts):
+        """Return a {text: translation} dict; texts with an untranslatable chunk map to None"""
+        texts = list(dict.fromkeys(texts))
+        chunked = {text: split_chunks(text, self.chunk_chars) for text in texts}
+
+        # Chunks are deduplicated across texts and looked up in the cache first
+        translated = {}
+        pending = []
+        for chunk in dict.fromkeys(chunk for chunks in chunked.values() for chunk, _ in chunks):
+            cached = self.cache.get(self.source, self.target, chunk) if self.cache and chunk.strip() else None
+            if cached is not None:
+                translated[chunk] = cached
+            else:
+                pending.append(chunk)
+
+        with self._lock:
+            self.stats["chunks"] += len(pending)
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            translated.update(zip(pending, executor.map(self._translate_chunk, pending)))
+
+        if self.cache:
+            fresh = [(chunk, translated[chunk]) for chunk in pending
+                     if chunk.strip() and translated[chunk] is not None]
+            if fresh:
+                self.cache.put_many(self.source, self.target, fresh)
+
+        results = {}
+        for text, chunks in chunked.items():
+            parts = [translated[chunk] for chunk, _ in chunks]
+            if any(part is None for part in parts):
+                results[text] = None
+            else:
+                results[text] = "".join(part + separator for part, (_, separator) in zip(parts, chunks))
+        return results
+
+    def report(self):
+        """Print chunk, request, retry and failure counters"""
+        print(f"\n💾 Body chunks translated: {self.stats['chunks']} "
+              f"({self.stats['requests']} requests, {self.stats['retries']} retries, "
+              f"{self.stats['failed']} failed)")
@@ -0,0 +1,23 @@
+# Word frequency helpers for the translated-title analysis
+
+import re
+from collections import Counter
+
+
+def tokenize(text):
+    """Lowercase word tokens of text, in order"""
+    return re.findall(r'\b\w+\b', text.lower())
+
+
+def count_words(texts):
+    """Count lowercase word tokens across texts"""
+    counts = Counter()
+    for text in texts:
+        counts.update(tokenize(text))
+    return counts
+
+
+def repeated_words(word_counts, threshold=2):
+    """Words appearing more than threshold times, most frequent first"""
+    repeated = [(word, count) for word, count in word_counts.items() if count > threshold]
+    return sorted(repeated, key=lambda x: x[1], reverse=True)